@@ -0,0 +1,270 @@
+"""
+benchmarks/run.py
+-----------------
+Data-layer benchmark suite. For every dataset size it loads synthetic
+tree_data into a scratch schema (krg_bench) of a LOCAL Postgres and times:
+
+    search     – legacy ILIKE query, pg_trgm similarity (if available),
+                 in-memory name index (build + query)
+    catalog    – legacy full listing, first and deep keyset pages
+    detail     – single-id and 25-id batched detail fetch
+    sync       – scripts/sync_excel_to_db on an unchanged and a 1 %-changed sheet
+    image fill – scripts/fill_image_paths
+
+Query-level timings bypass the in-process caches (they are cleared before
+each run) so they measure the database, not memory. Results are written to
+JSON (one file per commit) and can be diffed against an earlier run.
+
+Run:
+    BENCH_DATABASE_URL=postgresql://localhost/postgres python -m benchmarks.run
+    … --sizes 1000 10000 --repeat 20
+    … --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SCHEMA = "krg_bench"
+
+parser = argparse.ArgumentParser(description="KRG Tree Index data-layer benchmarks")
+parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+parser.add_argument("--repeat", type=int, default=20, help="timed runs per benchmark")
+parser.add_argument("--sync-max-rows", type=int, default=100_000,
+                    help="skip the spreadsheet sync above this size (xlsx gets slow)")
+parser.add_argument("--full-scan-max-rows", type=int, default=100_000,
+                    help="skip the legacy full catalog fetch above this size")
+parser.add_argument("--output", type=Path, default=None, help="JSON file to write")
+parser.add_argument("--compare", type=Path, default=None, help="earlier results JSON")
+args = parser.parse_args()
+
+bench_url = os.getenv("BENCH_DATABASE_URL")
+if not bench_url:
+    sys.exit("Set BENCH_DATABASE_URL to a local, throw-away Postgres database.")
+
+# Every unqualified `tree_data` now resolves to krg_bench.tree_data – the
+# suite never touches the real table even if pointed at a shared server.
+from psycopg2.extensions import make_dsn  # noqa: E402
+
+DSN = make_dsn(bench_url, options=f"-c search_path={SCHEMA}")
+os.environ["DATABASE_URL"] = DSN
+
+import db_handler  # noqa: E402  (must see the env above)
+import name_index  # noqa: E402
+import tree_queries  # noqa: E402
+from benchmarks.synthetic_data import COLUMNS, SCHEMA_SQL, search_terms, synthetic_rows  # noqa: E402
+
+# ------------------------------------------------------------------ #
+# Helpers
+# ------------------------------------------------------------------ #
+def measure(op, *, repeat: int = args.repeat, setup=None) -> dict:
+    """Time op(i) for i in range(repeat); setup() runs untimed before each."""
+    samples = []
+    for i in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        op(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def once(fn) -> dict:
+    return measure(lambda _: fn(), repeat=1)
+
+
+def cold() -> None:
+    db_handler.clear_query_cache()
+    tree_queries.invalidate_details()
+
+
+def run_script(module: str, *script_args: str) -> None:
+    env = {**os.environ, "DATABASE_URL": DSN, "PYTHONPATH": str(REPO_ROOT)}
+    subprocess.run(
+        [sys.executable, "-m", module, *script_args],
+        check=True, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+def reset_schema() -> None:
+    db_handler.execute_query(
+        f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}; {SCHEMA_SQL}"
+    )
+
+
+def try_trigram_indexes() -> bool:
+    try:
+        db_handler.execute_query(
+            """
+            CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+            CREATE INDEX tree_data_tree_name_trgm
+              ON tree_data USING gin (tree_name public.gin_trgm_ops);
+            CREATE INDEX tree_data_scientific_name_trgm
+              ON tree_data USING gin (scientific_name public.gin_trgm_ops);
+            """
+        )
+        return True
+    except db_handler.psycopg2.Error as e:
+        print(f"   (pg_trgm unavailable – skipping similarity search: {e.pgcode})")
+        return False
+
+
+def write_sheet(path: Path, n: int, changed_fraction: float) -> None:
+    import pandas as pd
+
+    df = pd.DataFrame(synthetic_rows(n), columns=list(COLUMNS))
+    if changed_fraction:
+        idx = df.sample(frac=changed_fraction, random_state=0).index
+        df.loc[idx, "rating"] = "★"
+    df.to_excel(path, index=False)
+
+
+LEGACY_SEARCH_SQL = """
+SELECT DISTINCT ON (tree_name) id, tree_name, scientific_name
+FROM tree_data
+WHERE tree_name ILIKE %s OR scientific_name ILIKE %s
+ORDER BY tree_name, id;
+"""
+LEGACY_CATALOG_SQL = """
+SELECT id, tree_name, scientific_name, image_path FROM tree_data ORDER BY tree_name;
+"""
+
+# ------------------------------------------------------------------ #
+# Suite
+# ------------------------------------------------------------------ #
+def bench_name_index(terms: list) -> dict:
+    names = db_handler.execute_query(name_index._NAMES_SQL, fetch=True)
+    res = {
+        "name_index_build": measure(
+            lambda _: name_index.NameIndex(names), repeat=min(3, args.repeat)
+        ),
+    }
+    index = name_index.NameIndex(names)
+    res["search_name_index"] = measure(lambda i: index.search(terms[i]))
+    return res
+
+
+def bench_size(n: int) -> dict:
+    res: dict[str, dict] = {}
+    print(f"▶  {n:,} rows")
+
+    reset_schema()
+    res["load_copy"] = once(lambda: db_handler.copy_rows("tree_data", synthetic_rows(n), COLUMNS))
+    db_handler.execute_query("CREATE INDEX ON tree_data (tree_name, id); ANALYZE tree_data;")
+    db_handler.bump_data_version()
+
+    terms = search_terms(args.repeat)
+    ids = [r["id"] for r in db_handler.execute_query(
+        "SELECT id FROM tree_data ORDER BY random() LIMIT 100;", fetch=True)]
+    rnd = random.Random(0)
+
+    # -- search -------------------------------------------------------
+    res["search_ilike_db"] = measure(
+        lambda i: db_handler.execute_query(
+            LEGACY_SEARCH_SQL, (f"%{terms[i]}%", f"%{terms[i]}%"), fetch=True)
+    )
+    if try_trigram_indexes():
+        res["search_similar_db"] = measure(
+            lambda i: tree_queries.search_similar(terms[i]), setup=cold
+        )
+    res.update(bench_name_index(terms))   # index freed before the catalog runs
+
+    # -- catalog ------------------------------------------------------
+    if n <= args.full_scan_max_rows:
+        res["catalog_full_legacy"] = measure(
+            lambda _: db_handler.execute_query(LEGACY_CATALOG_SQL, fetch=True),
+            repeat=min(5, args.repeat),
+        )
+    res["catalog_first_page"] = measure(lambda _: tree_queries.catalog_page(None), setup=cold)
+    mid = db_handler.execute_query(
+        "SELECT tree_name, id FROM tree_data ORDER BY tree_name, id OFFSET %s LIMIT 1;",
+        (n // 2,), fetch=True)[0]
+    res["catalog_deep_page"] = measure(
+        lambda _: tree_queries.catalog_page((mid["tree_name"], mid["id"])), setup=cold
+    )
+
+    # -- detail -------------------------------------------------------
+    res["detail_single"] = measure(
+        lambda _: tree_queries.get_tree_detail(rnd.choice(ids)), setup=cold
+    )
+    res["detail_batch_25"] = measure(
+        lambda _: tree_queries.get_tree_details(rnd.sample(ids, 25)), setup=cold
+    )
+
+    # -- scripts (timed end to end, incl. interpreter start-up) --------
+    if n <= args.sync_max_rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            same, changed = Path(tmp) / "same.xlsx", Path(tmp) / "changed.xlsx"
+            write_sheet(same, n, 0)
+            write_sheet(changed, n, 0.01)
+            res["sync_unchanged"] = once(
+                lambda: run_script("scripts.sync_excel_to_db", "--path", str(same)))
+            res["sync_1pct_changed"] = once(
+                lambda: run_script("scripts.sync_excel_to_db", "--path", str(changed)))
+    res["fill_image_paths"] = once(lambda: run_script("scripts.fill_image_paths"))
+
+    for name, r in res.items():
+        print(f"   {name:<22} median {r['median_ms']:>10.2f} ms   p95 {r['p95_ms']:>10.2f} ms")
+    return res
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\nΔ vs {baseline.get('commit')} (median, >1 = slower now)")
+    for size, benches in current["results"].items():
+        old = baseline.get("results", {}).get(size, {})
+        for name, r in benches.items():
+            if name in old and old[name]["median_ms"]:
+                ratio = r["median_ms"] / old[name]["median_ms"]
+                flag = "  ⚠️" if ratio > 1.2 else ""
+                print(f"   {size:>9} {name:<22} ×{ratio:5.2f}{flag}")
+
+
+if __name__ == "__main__":
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    try:
+        for size in args.sizes:
+            report["results"][str(size)] = bench_size(size)
+    finally:
+        db_handler.execute_query(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+
+    out = args.output or RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\n💾  Results written to {out}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
@@ -0,0 +1,144 @@
+"""
+benchmarks/synthetic_data.py
+----------------------------
+Deterministic fake tree_data rows for the benchmark suite: plausible common
+and scientific names, 1–10 scores with a matching total, and a few
+sentences of text per paragraph column.
+
+Names are built from real-looking parts plus a cultivar suffix derived from
+the row number, so (tree_name, scientific_name) stays unique at any size.
+"""
+
+import random
+from typing import Any, Dict, Iterator, Tuple
+
+SCORE_COLUMNS: Tuple[str, ...] = (
+    "climate_adaptation",
+    "water_efficiency",
+    "biodiversity_support",
+    "community_acceptance",
+    "aesthetic_cultural_fit",
+    "shade_public_use",
+    "cost_of_planting",
+    "maintenance_needs",
+    "lifespan_durability",
+)
+
+COLUMNS: Tuple[str, ...] = (
+    "tree_name",
+    "scientific_name",
+    "rating",
+    *SCORE_COLUMNS,
+    "total_score",
+    "information",
+    "suitability",
+    "challenges",
+    "image_path",
+)
+
+# Mirrors the production table closely enough for the queries we time.
+SCHEMA_SQL = f"""
+CREATE TABLE tree_data (
+    id              serial  PRIMARY KEY,
+    tree_name       text    NOT NULL,
+    scientific_name text,
+    rating          text,
+    {", ".join(f"{c} integer" for c in SCORE_COLUMNS)},
+    total_score     integer,
+    information     text,
+    suitability     text,
+    challenges      text,
+    image_path      text,
+    CONSTRAINT tree_unique_name_scientific UNIQUE (tree_name, scientific_name)
+);
+"""
+
+_PREFIXES = [
+    "Aleppo", "Black", "White", "Wild", "Stone", "Desert", "Mountain", "River",
+    "Persian", "Syrian", "Turkish", "Caucasian", "Lebanon", "Golden", "Silver",
+    "Red", "Weeping", "Dwarf", "Giant", "Kurdish", "Zagros", "Mesopotamian",
+]
+_BASES = [
+    "Oak", "Pine", "Poplar", "Willow", "Cypress", "Plane", "Ash", "Almond",
+    "Pistachio", "Walnut", "Mulberry", "Olive", "Pear", "Plum", "Hawthorn",
+    "Juniper", "Acacia", "Tamarisk", "Jujube", "Fig", "Palm", "Maple",
+]
+_GENERA = [
+    "Quercus", "Pinus", "Populus", "Salix", "Cupressus", "Platanus", "Fraxinus",
+    "Prunus", "Pistacia", "Juglans", "Morus", "Olea", "Pyrus", "Crataegus",
+    "Juniperus", "Acacia", "Tamarix", "Ziziphus", "Ficus", "Phoenix", "Acer",
+]
+_EPITHETS = [
+    "brantii", "aegilops", "libani", "halepensis", "brutia", "euphratica",
+    "nigra", "alba", "orientalis", "syriaca", "atlantica", "regia", "europaea",
+    "persica", "excelsa", "sempervirens", "arizonica", "aphylla", "spina-christi",
+]
+_SYLLABLES = [
+    "ka", "ro", "li", "na", "ve", "to", "sa", "mi", "de", "lu", "ra", "zo",
+    "be", "ni", "ta", "lo", "ze", "ma", "di", "ko", "va", "ri", "so", "me",
+]
+_WORDS = (
+    "drought tolerant roots shade canopy soil water summer winter frost urban "
+    "street park native pollinators birds slow fast growth pruning pests "
+    "irrigation saline clay rocky slopes wind erosion fruit timber heritage "
+    "maintenance lifespan resilient evergreen deciduous bark leaves seedlings"
+).split()
+
+
+def _cultivar(i: int) -> str:
+    """Unique pronounceable word for row *i* ('Ka', 'Karo', 'Roli', …)."""
+    parts = []
+    while True:
+        i, r = divmod(i, len(_SYLLABLES))
+        parts.append(_SYLLABLES[r])
+        if i == 0:
+            break
+        i -= 1
+    return "".join(parts).capitalize()
+
+
+def _paragraph(rnd: random.Random, sentences: int) -> str:
+    out = []
+    for _ in range(sentences):
+        words = rnd.choices(_WORDS, k=rnd.randint(8, 16))
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+def synthetic_rows(n: int, *, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield *n* rows shaped like tree_data (without id)."""
+    rnd = random.Random(seed)
+    for i in range(n):
+        cultivar = _cultivar(i)
+        scores = {c: rnd.randint(1, 10) for c in SCORE_COLUMNS}
+        total = sum(scores.values())
+        yield {
+            "tree_name": f"{rnd.choice(_PREFIXES)} {rnd.choice(_BASES)} {cultivar}",
+            "scientific_name": f"{rnd.choice(_GENERA)} {rnd.choice(_EPITHETS)} '{cultivar}'",
+            "rating": "★" * max(1, round(total / 18)),
+            **scores,
+            "total_score": total,
+            "information": _paragraph(rnd, 3),
+            "suitability": _paragraph(rnd, 2),
+            "challenges": _paragraph(rnd, 2),
+            "image_path": None,
+        }
+
+
+def search_terms(n: int, *, seed: int = 1) -> list[str]:
+    """Realistic search inputs: prefixes, substrings, full words and typos."""
+    rnd = random.Random(seed)
+    terms = []
+    for _ in range(n):
+        word = rnd.choice(_BASES + _GENERA + _PREFIXES).lower()
+        kind = rnd.randrange(4)
+        if kind == 0:
+            terms.append(word[: rnd.randint(2, 4)])                 # typing a prefix
+        elif kind == 1:
+            terms.append(word[1:-1] if len(word) > 4 else word)   # substring
+        elif kind == 2:
+            terms.append(word)                                     # full word
+        else:
+            j = rnd.randrange(len(word) - 1)                        # transposition typo
+            terms.append(word[:j] + word[j + 1] + word[j] + word[j + 2:])
+    return terms
@@ -0,0 +1,202 @@
+# cache_utils.py
+"""
+Small in-process caches shared by every Streamlit session of one server.
+
+LRUCache is bounded by entry count *and* approximate byte size, evicts the
+least-recently-used entry first and can expire entries after a TTL.
+
+SingleFlight collapses concurrent identical calls into one: the first
+caller for a key runs the function, everyone arriving meanwhile waits for
+and shares its result (or exception).
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+def approx_size(obj: Any) -> int:
+    """
+    Rough deep size in bytes for the kinds of values we cache
+    (query rows = list[dict], bytes, str, numbers).
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            approx_size(k) + approx_size(v) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(approx_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache.
+
+    max_entries – hard cap on the number of entries (0 = no cap)
+    max_bytes   – cap on the summed ``sizeof(value)`` (0 = no cap)
+    ttl         – default lifetime in seconds (None = never expires)
+    sizeof      – function estimating a value's size in bytes
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    # -- internals ------------------------------------------------------
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _shrink(self) -> None:
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._drop(key)
+            self._stats["evictions"] += 1
+
+    # -- public API -----------------------------------------------------
+    def get(self, key: Hashable, default: Any = None, *, count: bool = True) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                if count:
+                    self._stats["misses"] += 1
+                return default
+            value, _, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                if count:
+                    self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            if count:
+                self._stats["hits"] += 1
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: Optional[float] = _MISSING,   # type: ignore[assignment]
+        size: Optional[int] = None,
+    ) -> bool:
+        """
+        Store *value*. Returns False (and stores nothing) if the value alone
+        is larger than max_bytes.
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        size = self.sizeof(value) if size is None else size
+        if self.max_bytes and size > self.max_bytes:
+            return False
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            self._shrink()
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key][0]
+            self._drop(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._data), "bytes": self._bytes}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing ("single flight").
+
+    do(key, fn) runs fn() unless a call with the same *key* is already in
+    flight, in which case it waits for that call and returns its result.
+    Nothing is remembered once a call finishes – pair it with a cache for
+    that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
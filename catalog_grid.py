@@ -0,0 +1,90 @@
+# catalog_grid.py
+"""
+Renders one catalog page as a single HTML block.
+
+Building the grid from Streamlit widgets (st.columns per row, st.subheader,
+an invisible st.button and an st.image per tree) costs several websocket
+deltas per tree and inlines every image into the page payload. Here the
+whole grid is ONE st.html() message:
+
+• images are static-served thumbnail URLs (see thumbnails.static_url) with
+  loading="lazy" and a 1×/2× srcset, so the browser fetches – and caches –
+  only what scrolls into view
+• each card links to the Tree Search page with ?tree=<id>; that page
+  opens the tree from the query param
+"""
+
+import base64
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from lfs_bootstrap import is_pointer
+from thumbnails import THUMB_DENSITY, static_url, thumbnail_path
+
+REPO_ROOT = Path(__file__).parent
+DETAIL_PAGE = "tree_search"            # URL path of pages/tree_search.py
+
+IMG_MAX_WIDTH = 240                    # CSS px; cards shrink below that
+SRCSET_WIDTHS: Tuple[int, ...] = (140, 240)   # thumbnail widths offered
+
+_CSS = f"""
+<style>
+.krg-grid {{ display: grid; gap: 1.25rem 1rem;
+            grid-template-columns: repeat(auto-fill, minmax(180px, 1fr)); }}
+.krg-card {{ display: block; color: inherit; text-decoration: none;
+            border-bottom: 1px solid rgba(128,128,128,.3); padding-bottom: .75rem; }}
+.krg-card:hover h4 {{ text-decoration: underline; }}
+.krg-card h4 {{ margin: 0 0 .5rem; font-size: 1.15rem; }}
+.krg-card img, .krg-card .krg-ph {{ width: 100%; max-width: {IMG_MAX_WIDTH}px; aspect-ratio: 4 / 3;
+            object-fit: cover; border-radius: 4px; display: block; }}
+.krg-card .krg-ph {{ display: flex; align-items: center; justify-content: center;
+            background: rgba(128,128,128,.12); font-size: .8rem; opacity: .7; }}
+.krg-card .krg-sci {{ font-style: italic; margin-top: .4rem; }}
+</style>
+"""
+
+
+def _image_url(thumb: Path) -> str:
+    url = static_url(thumb)
+    if url is None:                      # THUMB_DIR outside ./static: inline it
+        url = "data:image/webp;base64," + base64.b64encode(thumb.read_bytes()).decode()
+    return url
+
+
+def _img_tag(rel_path: Optional[str], alt: str) -> str:
+    """<img> with lazy loading + srcset, or a placeholder block."""
+    if not rel_path:
+        return "<div class='krg-ph'>(no image)</div>"
+    src = REPO_ROOT / rel_path
+    candidates = []
+    for w in SRCSET_WIDTHS:
+        thumb = thumbnail_path(src, w)
+        if thumb is not None:
+            candidates.append((_image_url(thumb), w * THUMB_DENSITY))
+    if not candidates:
+        label = "image loading…" if is_pointer(src) else "image not found"
+        return f"<div class='krg-ph'>({label})</div>"
+    srcset = ", ".join(f"{escape(url)} {px}w" for url, px in candidates)
+    return (
+        f"<img src='{escape(candidates[0][0])}' srcset='{srcset}' "
+        f"sizes='(max-width: 640px) 50vw, {IMG_MAX_WIDTH}px' "
+        f"alt='{escape(alt)}' loading='lazy' decoding='async'>"
+    )
+
+
+def card_html(row: Dict[str, Any]) -> str:
+    name = row["tree_name"] or ""
+    return (
+        f"<a class='krg-card' href='{DETAIL_PAGE}?tree={int(row['id'])}' target='_self' "
+        f"title='Click for full details'>"
+        f"<h4>{escape(name)}</h4>"
+        f"{_img_tag(row.get('image_path'), name)}"
+        f"<div class='krg-sci'>{escape(row.get('scientific_name') or '')}</div>"
+        f"</a>"
+    )
+
+
+def catalog_html(rows: Iterable[Dict[str, Any]]) -> str:
+    """The whole grid for *rows* (id, tree_name, scientific_name, image_path)."""
+    return _CSS + "<div class='krg-grid'>" + "".join(card_html(r) for r in rows) + "</div>"
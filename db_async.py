@@ -0,0 +1,99 @@
+# db_async.py
+"""
+asyncio counterpart of db_handler, so independent queries of one page
+render can overlap instead of running back to back.
+
+psycopg2 is a blocking driver, so each call runs on a dedicated worker
+thread (one per pooled connection, DB_POOL_MAX_SIZE) and borrows a
+connection from db_handler's shared pool – the coroutines just await the
+result. That keeps the exact same SQL, params style and result shape.
+
+Async code:
+    rows, tree = await asyncio.gather(
+        fetch("SELECT …"), call(get_tree_detail, 7)
+    )
+
+Streamlit scripts (sync bridge):
+    tree, rows = run_concurrently(
+        lambda: get_tree_detail(7),
+        lambda: search_trees("oak"),
+    )
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+
+import db_handler
+
+_executor = ThreadPoolExecutor(
+    max_workers=db_handler.POOL_MAX_SIZE, thread_name_prefix="db-async"
+)
+
+# ---------------------------------------------------------------------
+# Coroutine helpers
+# ---------------------------------------------------------------------
+async def call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run any blocking data-access function on the DB worker threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def fetch(query: str, params: Optional[tuple | list | dict] = None) -> List[Any]:
+    """Async execute_query(fetch=True)."""
+    return await call(db_handler.execute_query, query, params, fetch=True)
+
+
+async def fetch_cached(
+    query: str,
+    params: Optional[tuple | list | dict] = None,
+    *,
+    ttl: Optional[float] = None,
+) -> List[Any]:
+    """Async cached_query() – cache hits return without a DB round trip."""
+    return await call(db_handler.cached_query, query, params, ttl=ttl)
+
+
+async def execute(query: str, params: Optional[tuple | list | dict] = None) -> None:
+    """Async execute_query() for statements without a result."""
+    await call(db_handler.execute_query, query, params)
+
+
+async def gather_queries(*aws: Awaitable[Any]) -> List[Any]:
+    """asyncio.gather() that fails fast: the first error is re-raised."""
+    return list(await asyncio.gather(*aws))
+
+# ---------------------------------------------------------------------
+# Sync bridge for Streamlit scripts
+# ---------------------------------------------------------------------
+# Script threads must not start/stop an event loop per rerun, so one
+# long-lived loop runs in a daemon thread and we hand coroutines to it.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="db-async-loop", daemon=True
+            ).start()
+            _loop = loop
+        return _loop
+
+
+def run(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run *coro* on the shared background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
+
+
+def run_concurrently(*fns: Callable[[], Any], timeout: Optional[float] = None) -> List[Any]:
+    """
+    Call the zero-argument callables concurrently and return their results
+    in order – page latency becomes max(call) instead of sum(calls).
+    """
+    return run(gather_queries(*(call(fn) for fn in fns)), timeout)
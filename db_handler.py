@@ -6,23 +6,54 @@ Light-weight PostgreSQL helper for Neon.
 Features
 --------
 • Environment-driven DATABASE_URL (falls back to DEFAULT_DB_URL).
-• Context-manager connection to ensure close().
-• execute_query()  – run one statement, fetch optional.
+• Optional read replicas (DATABASE_READ_URLS): read-only queries are
+  spread over them round-robin, everything else goes to the primary.
+• Process-wide, thread-safe connection pools behind get_connection()
+  (health-checked on checkout, idle connections recycled).
+• pool_stats()     – checkouts / waits / creates counters.
+• execute_query()  – run one statement, fetch optional; reads are retried
+                     with jittered backoff on transient errors.
 • execute_many()   – bulk insert/update.
+• iter_query()     – stream a large result through a server-side cursor.
+• copy_rows()      – stream rows / DataFrames into a table via COPY.
+• bulk_upsert()    – COPY into a staging table, then INSERT … ON CONFLICT.
+• bulk_update()    – COPY into a staging table, then UPDATE … FROM.
+• cached_query()   – shared, TTL + LRU cached reads, invalidated whenever
+                     the data version (bumped by the sync scripts) changes.
 • Command-line utilities:
     └─ python db_handler.py               # quick connection test
     └─ python db_handler.py --cleanup-duplicates
        (deletes duplicate trees + adds UNIQUE constraint)
+    └─ python db_handler.py --create-trigram-indexes
+       (enables pg_trgm + GIN trigram indexes for name search)
+    └─ python db_handler.py --create-catalog-index
+       ((tree_name, id) index backing the paginated catalog)
+    └─ python db_handler.py --bump-data-version
+       (invalidate every app server's query cache after a manual edit)
 """
 
+import atexit
+import io
 import os
+import random
+import re
 import sys
-from contextlib import contextmanager
-from typing import Any, Iterable, List, Optional
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import count, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import psycopg2                      # pip install psycopg2-binary
+from psycopg2 import errors as pg_errors, extensions, sql
 from psycopg2.extras import RealDictCursor, execute_batch
 
+import metrics
+from cache_utils import LRUCache, SingleFlight
+
 # ---------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------
@@ -34,40 +65,476 @@ DEFAULT_DB_URL = (
 
 DATABASE_URL: str = os.getenv("DATABASE_URL", DEFAULT_DB_URL)
 
+# Read replicas, comma-separated. Without any, reads use DATABASE_URL too.
+DATABASE_READ_URLS: List[str] = [
+    u.strip() for u in os.getenv("DATABASE_READ_URLS", "").split(",") if u.strip()
+]
+# After this process writes, its reads stay on the primary for this many
+# seconds so it sees its own writes despite replica lag.
+READ_AFTER_WRITE: float = float(os.getenv("DB_READ_AFTER_WRITE", "5"))
+# An unreachable replica is skipped for this many seconds.
+REPLICA_RETRY_AFTER: float = float(os.getenv("DB_REPLICA_RETRY_AFTER", "10"))
+
+# Retries of idempotent reads on transient errors (dropped connection,
+# failover, serialization conflict): full-jitter exponential backoff.
+RETRY_ATTEMPTS: int = int(os.getenv("DB_RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY: float = float(os.getenv("DB_RETRY_BASE_DELAY", "0.1"))
+RETRY_MAX_DELAY: float = float(os.getenv("DB_RETRY_MAX_DELAY", "2"))
+
+# Pool sizing / recycling (seconds). Every Neon connection costs a TLS +
+# channel-binding handshake, so we keep a few warm ones around.
+POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_MAX_IDLE: float = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+POOL_PING_AFTER: float = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
+# Shared query-result cache (see cached_query()).
+QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", "600"))
+QUERY_CACHE_MAX_ENTRIES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+QUERY_CACHE_MAX_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# How often (seconds) we ask the DB whether the data version moved.
+DATA_VERSION_POLL: float = float(os.getenv("DATA_VERSION_POLL", "30"))
+
+# Rows fetched per network round trip by iter_query().
+ITER_SIZE: int = int(os.getenv("DB_ITER_SIZE", "2000"))
+
+# Rows per chunk for the COPY-based bulk helpers.
+COPY_CHUNK_ROWS: int = int(os.getenv("COPY_CHUNK_ROWS", "10000"))
+
+# ---------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection becomes free within POOL_TIMEOUT."""
+
+
+class ConnectionPool:
+    """
+    Small thread-safe pool of psycopg2 connections.
+
+    • At most *max_size* connections are open; callers beyond that wait
+      (up to *timeout* seconds) for one to be returned.
+    • Checkout is health-checked: closed/broken connections are dropped and
+      connections idle longer than *ping_after* get a ``SELECT 1`` first.
+    • Connections idle longer than *max_idle* (above *min_size*) or older
+      than *max_lifetime* are closed instead of being reused.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        max_idle: float = POOL_MAX_IDLE,
+        max_lifetime: float = POOL_MAX_LIFETIME,
+        ping_after: float = POOL_PING_AFTER,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("need 0 <= min_size <= max_size and max_size >= 1")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()          # (conn, created_at, last_used)
+        self._born: Dict[int, float] = {}    # id(conn) -> created_at
+        self._size = 0                       # idle + checked out
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "creates": 0,
+            "discards": 0,
+            "timeouts": 0,
+        }
+
+    # -- internals ------------------------------------------------------
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, cursor_factory=RealDictCursor)
+        with self._cond:
+            self._stats["creates"] += 1
+            self._born[id(conn)] = time.monotonic()
+        return conn
+
+    def _close(self, conn) -> None:
+        """Close *conn* and release its slot (caller must NOT hold the lock)."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._born.pop(id(conn), None)
+            self._size -= 1
+            self._stats["discards"] += 1
+            self._cond.notify()
+
+    def _healthy(self, conn, idle_for: float) -> bool:
+        if conn.closed:
+            return False
+        status = conn.get_transaction_status()
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _expired(
+        self, created_at: float, last_used: float, now: float, live: int
+    ) -> bool:
+        if now - created_at > self.max_lifetime:
+            return True
+        return now - last_used > self.max_idle and live > self.min_size
+
+    # -- public API -----------------------------------------------------
+    def getconn(self):
+        """Check a connection out, creating or waiting for one as needed."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            candidate = None
+            stale = []
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                now = time.monotonic()
+                while self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                    live = self._size - len(stale)
+                    if self._expired(created_at, last_used, now, live):
+                        stale.append(conn)
+                        continue
+                    candidate = (conn, now - last_used)
+                    break
+                if candidate is None and self._size - len(stale) < self.max_size:
+                    self._size += 1
+                    create = True
+                elif candidate is None and not stale:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"no free DB connection after {self.timeout:.0f}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            for conn in stale:
+                self._close(conn)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif candidate is not None:
+                conn, idle_for = candidate
+                if not self._healthy(conn, idle_for):
+                    self._close(conn)
+                    continue
+            else:
+                continue                     # freed slots – try again
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return conn
+
+    def putconn(self, conn, *, discard: bool = False) -> None:
+        """Return *conn* to the pool (rolled back), or close it if broken."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed:
+            self._close(conn)
+            return
+
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                closing = True
+            else:
+                closing = False
+                created_at = self._born.get(id(conn), now)
+                self._idle.append((conn, created_at, now))
+                self._cond.notify()
+        if closing:
+            self._close(conn)
+
+    def fill(self) -> None:
+        """Open connections until *min_size* are available."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = [c for c, _, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_read_pools: Optional[List[ConnectionPool]] = None
+_pool_lock = threading.Lock()
+_next_read = count()
+_last_write_at = float("-inf")
+_replica_down_until: Dict[int, float] = {}   # id(pool) -> monotonic time
+
+
+def _open_pool(dsn: str) -> ConnectionPool:
+    pool = ConnectionPool(dsn)
+    try:
+        pool.fill()
+    except psycopg2.Error as e:
+        print("⚠️  Could not pre-open DB connections:", e, file=sys.stderr)
+    atexit.register(pool.closeall)
+    return pool
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool for the primary, created on first use (shared by all sessions)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _open_pool(DATABASE_URL)
+    return _pool
+
+
+def get_read_pools() -> List[ConnectionPool]:
+    """One pool per DATABASE_READ_URLS entry (empty list without replicas)."""
+    global _read_pools
+    if _read_pools is None:
+        with _pool_lock:
+            if _read_pools is None:
+                _read_pools = [_open_pool(url) for url in DATABASE_READ_URLS]
+    return _read_pools
+
+
+def _read_order() -> List[ConnectionPool]:
+    """Pools to try for a read: replicas round-robin, then the primary."""
+    replicas = get_read_pools()
+    now = time.monotonic()
+    if not replicas or now - _last_write_at < READ_AFTER_WRITE:
+        return [get_pool()]
+    start = next(_next_read) % len(replicas)
+    up = [
+        p for p in replicas[start:] + replicas[:start]
+        if _replica_down_until.get(id(p), 0) <= now
+    ]
+    return up + [get_pool()]
+
+
+def pool_stats() -> Dict[str, int]:
+    """Counters for the shared pool (checkouts, waits, creates, …)."""
+    return get_pool().stats()
+
+
+def read_pool_stats() -> Dict[str, int]:
+    """pool_stats() summed over the replica pools."""
+    total: Dict[str, int] = {}
+    for pool in get_read_pools():
+        for k, v in pool.stats().items():
+            total[k] = total.get(k, 0) + v
+    return total
+
 # ---------------------------------------------------------------------
 # Connection helper
 # ---------------------------------------------------------------------
 @contextmanager
-def get_connection():
+def get_connection(*, readonly: bool = False):
     """
-    Yields a psycopg2 connection. Closes it automatically on exit.
+    Yields a pooled psycopg2 connection and hands it back on exit.
+    Uncommitted work is rolled back; broken connections are discarded.
+    With readonly=True the connection comes from a read replica (the next
+    one round-robin; unreachable ones are skipped, the primary is the last
+    resort) – only run statements that don't write on it.
     """
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    if readonly:
+        pool, conn = _read_conn()
+    else:
+        pool = get_pool()
+        conn = pool.getconn()
+    discard = False
     try:
         yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
     finally:
-        conn.close()
+        pool.putconn(conn, discard=discard)
+
+def _note_write() -> None:
+    """A write was committed: keep this process's reads on the primary for
+    READ_AFTER_WRITE seconds (the query helpers call this)."""
+    global _last_write_at
+    if DATABASE_READ_URLS:
+        _last_write_at = time.monotonic()
+
+
+def _read_conn():
+    pools = _read_order()
+    for i, pool in enumerate(pools):
+        try:
+            return pool, pool.getconn()
+        except PoolTimeout:
+            raise
+        except psycopg2.OperationalError as e:
+            if i == len(pools) - 1:
+                raise
+            _replica_down_until[id(pool)] = time.monotonic() + REPLICA_RETRY_AFTER
+            print(f"⚠️  Read replica unavailable, skipping it for {REPLICA_RETRY_AFTER:.0f}s: "
+                  f"{_first_line(e)}", file=sys.stderr)
+            if metrics.ENABLED:
+                metrics.inc("db_replica_failovers_total")
+    raise AssertionError("unreachable")
+
+# ---------------------------------------------------------------------
+# Read routing / retry
+# ---------------------------------------------------------------------
+_COMMENTS = re.compile(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*", re.S)
+_WRITE_WORDS = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|ALTER|DROP|TRUNCATE|GRANT|REFRESH|"
+    r"NEXTVAL|SETVAL|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b",
+    re.I,
+)
+
+
+@lru_cache(maxsize=512)                       # queries are mostly module constants
+def is_read_only(query: str) -> bool:
+    """
+    True for a plain SELECT / WITH … SELECT / VALUES / SHOW / TABLE: safe
+    to send to a replica and to retry. Anything that might write (incl.
+    SELECT … FOR UPDATE and nextval()) counts as a write.
+    """
+    body = _COMMENTS.sub("", query, count=1)
+    first = body.split(None, 1)[0].upper() if body.strip() else ""
+    return first in ("SELECT", "WITH", "VALUES", "SHOW", "TABLE") and not _WRITE_WORDS.search(body)
+
+
+# SQLSTATEs worth retrying besides class 08 (connection exception).
+_TRANSIENT_SQLSTATES = {
+    "40001",   # serialization_failure (also hot-standby recovery conflicts)
+    "40P01",   # deadlock_detected
+    "53300",   # too_many_connections
+    "57P01",   # admin_shutdown
+    "57P02",   # crash_shutdown
+    "57P03",   # cannot_connect_now
+}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Would the same read probably succeed on a fresh connection?"""
+    if isinstance(error, PoolTimeout):          # already waited POOL_TIMEOUT
+        return False
+    code = getattr(error, "pgcode", None)
+    if code:
+        return code.startswith("08") or code in _TRANSIENT_SQLSTATES
+    # No SQLSTATE: the connection dropped / couldn't be opened.
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+
+def _first_line(error: BaseException) -> str:
+    return (str(error).strip().splitlines() or [type(error).__name__])[0]
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max, base * 2**attempt)]."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
 
 # ---------------------------------------------------------------------
 # Query helpers
 # ---------------------------------------------------------------------
+def _execute(query, params, fetch: bool, readonly: bool) -> List[Any] | None:
+    with get_connection(readonly=readonly) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            result = cur.fetchall() if fetch else None
+            conn.commit()
+    if not is_read_only(query):
+        _note_write()
+    return result
+
+
 def execute_query(
     query: str,
     params: Optional[tuple | list | dict] = None,
     *,
     fetch: bool = False,
+    name: Optional[str] = None,
 ) -> List[Any] | None:
     """
     Run a single SQL statement.
     If fetch=True, returns list[dict]; else returns None.
+    *name* tags the query in the timing metrics / slow-query log.
+
+    Read-only fetches (see is_read_only) go to a read replica when any are
+    configured and are retried up to RETRY_ATTEMPTS times on transient
+    errors. Other statements go to the primary and are never retried.
     """
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, params)
-            if fetch:
-                result = cur.fetchall()
-            conn.commit()
-    return result if fetch else None
+    readonly = fetch and is_read_only(query)
+    t0 = time.perf_counter()
+    try:
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            try:
+                return _execute(query, params, fetch, readonly)
+            except psycopg2.Error as e:
+                if not (readonly and attempt < RETRY_ATTEMPTS and is_transient(e)):
+                    raise
+                delay = _backoff(attempt)
+                print(f"⚠️  Retrying {name or 'query'} in {delay:.2f}s: {_first_line(e)}",
+                      file=sys.stderr)
+                if metrics.ENABLED:
+                    metrics.inc("db_retries_total", query=name or "unnamed")
+                time.sleep(delay)
+    finally:
+        if metrics.ENABLED:
+            metrics.observe_query(name, time.perf_counter() - t0, query)
 
 
 def execute_many(query: str, seq_of_params: Iterable[tuple | list | dict]):
@@ -78,6 +545,460 @@ def execute_many(query: str, seq_of_params: Iterable[tuple | list | dict]):
         with conn.cursor() as cur:
             execute_batch(cur, query, seq_of_params)
         conn.commit()
+    _note_write()
+
+def iter_query(
+    query: str,
+    params: Optional[tuple | list | dict] = None,
+    *,
+    itersize: int = ITER_SIZE,
+    as_tuples: bool = False,
+) -> Iterator[Any]:
+    """
+    Stream the rows of a SELECT through a named (server-side) cursor,
+    *itersize* rows per round trip, so memory stays flat however many rows
+    match. Yields dicts, or plain tuples with as_tuples=True.
+    The pooled connection is held until the generator is exhausted/closed.
+    """
+    factory = extensions.cursor if as_tuples else RealDictCursor
+    with get_connection(readonly=is_read_only(query)) as conn:
+        with conn.cursor(name=f"iter_{uuid.uuid4().hex}", cursor_factory=factory) as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            yield from cur
+        conn.rollback()                      # read-only; end the transaction
+
+# ---------------------------------------------------------------------
+# COPY-based bulk writes
+# ---------------------------------------------------------------------
+# Every value is written quoted and NULL as an unquoted empty field (the
+# csv default), so no string – not even "" or "\N" – can turn into NULL.
+def _csv_field(v: Any) -> str:
+    return "" if v is None else '"' + str(v).replace('"', '""') + '"'
+
+
+def _iter_rows(rows: Any, columns: Sequence[str]) -> Iterator[Sequence[Any]]:
+    """
+    Normalise *rows* to sequences ordered like *columns*. Accepts any
+    iterable of tuples/lists/dicts or a pandas DataFrame (NaN -> NULL).
+    """
+    if hasattr(rows, "itertuples") and hasattr(rows, "columns"):   # DataFrame
+        frame = rows[list(columns)]
+        # An integer column with any NaN has a float dtype; write 7.0 as 7
+        # so COPY into an integer column accepts it.
+        floats = [i for i, dtype in enumerate(frame.dtypes) if dtype.kind == "f"]
+        frame = frame.astype(object).where(frame.notna(), None)
+        for row in frame.itertuples(index=False, name=None):
+            if floats:
+                row = list(row)
+                for i in floats:
+                    if row[i] is not None and row[i].is_integer():
+                        row[i] = int(row[i])
+            yield row
+        return
+    for row in rows:
+        if isinstance(row, dict):
+            yield [row.get(c) for c in columns]
+        else:
+            yield row
+
+
+def _chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+class _CopyStream(io.TextIOBase):
+    """
+    Read-only file object that renders rows to CSV lazily, one chunk at
+    a time, so COPY FROM STDIN never needs the whole data set in memory.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]], chunk_size: int):
+        self._chunks = _chunked(rows, chunk_size)
+        self._buf = ""
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _render(self, chunk: List[Sequence[Any]]) -> str:
+        self.rows += len(chunk)
+        return "".join(",".join(map(_csv_field, row)) + "\n" for row in chunk)
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += self._render(chunk)
+        if size < 0:
+            data, self._buf = self._buf, ""
+        else:
+            data, self._buf = self._buf[:size], self._buf[size:]
+        return data
+
+
+def _copy_into(cur, table: sql.Composable, columns: Sequence[str], rows, chunk_size: int) -> int:
+    stream = _CopyStream(rows, chunk_size)
+    cur.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '')").format(
+            table,
+            sql.SQL(", ").join(map(sql.Identifier, columns)),
+        ),
+        stream,
+        size=64 * 1024,
+    )
+    return stream.rows
+
+
+def _columns_of(rows: Any, columns: Optional[Sequence[str]]) -> List[str]:
+    if columns is not None:
+        return list(columns)
+    if hasattr(rows, "columns"):
+        return [str(c) for c in rows.columns]
+    raise ValueError("columns are required unless rows is a DataFrame")
+
+
+def copy_rows(
+    table: str,
+    rows: Any,
+    columns: Optional[Sequence[str]] = None,
+    *,
+    chunk_size: int = COPY_CHUNK_ROWS,
+    conn=None,
+) -> int:
+    """
+    Append *rows* to *table* with COPY FROM STDIN, streaming *chunk_size*
+    rows at a time. Returns the number of rows copied.
+    Pass *conn* to run inside the caller's transaction (no commit here).
+    """
+    columns = _columns_of(rows, columns)
+    with (nullcontext(conn) if conn is not None else get_connection()) as c:
+        with c.cursor() as cur:
+            n = _copy_into(cur, sql.Identifier(table), columns, _iter_rows(rows, columns), chunk_size)
+        if conn is None:
+            c.commit()
+            _note_write()
+    return n
+
+
+def _staged_write(
+    table: str,
+    rows: Any,
+    columns: Optional[Sequence[str]],
+    key: Sequence[str],
+    chunk_size: int,
+    conn,
+    build_statement,
+) -> int:
+    """COPY each chunk into a temp table shaped like *table*, then apply it."""
+    columns = _columns_of(rows, columns)
+    missing = [k for k in key if k not in columns]
+    if missing:
+        raise ValueError(f"key column(s) {missing} not in columns")
+    stage = sql.Identifier(f"_stage_{table}")
+    col_ids = sql.SQL(", ").join(map(sql.Identifier, columns))
+    # Last row wins when a key repeats inside one chunk.
+    dedup = sql.SQL("SELECT DISTINCT ON ({key}) {cols} FROM {stage} ORDER BY {key}, ctid DESC").format(
+        key=sql.SQL(", ").join(map(sql.Identifier, key)), cols=col_ids, stage=stage
+    )
+    statement = build_statement(sql.Identifier(table), columns, col_ids, dedup)
+
+    affected = 0
+    with (nullcontext(conn) if conn is not None else get_connection()) as c:
+        with c.cursor() as cur:
+            cur.execute(
+                sql.SQL(
+                    "CREATE TEMP TABLE IF NOT EXISTS {stage} "
+                    "AS SELECT {cols} FROM {table} WITH NO DATA"
+                ).format(stage=stage, cols=col_ids, table=sql.Identifier(table))
+            )
+            for chunk in _chunked(_iter_rows(rows, columns), chunk_size):
+                cur.execute(sql.SQL("TRUNCATE {}").format(stage))
+                _copy_into(cur, stage, columns, chunk, chunk_size)
+                cur.execute(statement)
+                affected += cur.rowcount
+            cur.execute(sql.SQL("DROP TABLE {}").format(stage))
+        if conn is None:
+            c.commit()
+            _note_write()
+    return affected
+
+
+def bulk_upsert(
+    table: str,
+    rows: Any,
+    columns: Optional[Sequence[str]] = None,
+    *,
+    key: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = COPY_CHUNK_ROWS,
+    conn=None,
+) -> int:
+    """
+    Insert-or-update *rows* keyed on *key* (needs a UNIQUE constraint on
+    it). Each chunk is COPY'd into a temp staging table and merged with
+    INSERT … ON CONFLICT. Rows whose values are unchanged are not touched.
+    Returns the number of rows inserted or updated.
+    """
+
+    def build(target, columns, col_ids, dedup):
+        updates = [c for c in (update_columns or columns) if c not in key]
+        if not updates:
+            action = sql.SQL("DO NOTHING")
+        else:
+            action = sql.SQL("DO UPDATE SET {sets} WHERE ({old}) IS DISTINCT FROM ({new})").format(
+                sets=sql.SQL(", ").join(
+                    sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in updates
+                ),
+                old=sql.SQL(", ").join(sql.Identifier(table, c) for c in updates),
+                new=sql.SQL(", ").join(sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in updates),
+            )
+        return sql.SQL("INSERT INTO {target} ({cols}) {dedup} ON CONFLICT ({key}) {action}").format(
+            target=target,
+            cols=col_ids,
+            dedup=dedup,
+            key=sql.SQL(", ").join(map(sql.Identifier, key)),
+            action=action,
+        )
+
+    return _staged_write(table, rows, columns, key, chunk_size, conn, build)
+
+
+def bulk_update(
+    table: str,
+    rows: Any,
+    columns: Optional[Sequence[str]] = None,
+    *,
+    key: Sequence[str] = ("id",),
+    chunk_size: int = COPY_CHUNK_ROWS,
+    conn=None,
+) -> int:
+    """
+    UPDATE existing rows of *table* matched on *key* from *rows* (no
+    inserts). Returns the number of rows that actually changed.
+    """
+
+    def build(target, columns, col_ids, dedup):
+        sets = [c for c in columns if c not in key]
+        return sql.SQL(
+            "UPDATE {target} AS t SET {sets} FROM ({dedup}) AS s "
+            "WHERE {match} AND ({old}) IS DISTINCT FROM ({new})"
+        ).format(
+            target=target,
+            sets=sql.SQL(", ").join(sql.SQL("{0} = s.{0}").format(sql.Identifier(c)) for c in sets),
+            dedup=dedup,
+            match=sql.SQL(" AND ").join(sql.SQL("t.{0} = s.{0}").format(sql.Identifier(k)) for k in key),
+            old=sql.SQL(", ").join(sql.Identifier("t", c) for c in sets),
+            new=sql.SQL(", ").join(sql.Identifier("s", c) for c in sets),
+        )
+
+    return _staged_write(table, rows, columns, key, chunk_size, conn, build)
+
+# ---------------------------------------------------------------------
+# Data version marker
+# ---------------------------------------------------------------------
+# A single-row table holding a counter. Anything that rewrites tree_data
+# (sync_excel_to_db, fill_image_paths, …) calls bump_data_version(); app
+# servers poll it at most every DATA_VERSION_POLL seconds and drop their
+# cached results when it moves.
+_CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id         integer     PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version    bigint      NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+_version_lock = threading.Lock()
+_version_value: int = 0
+_version_checked_at: float = float("-inf")
+
+
+def _note_version(version: int) -> None:
+    """Record *version*; clears the query cache if it changed."""
+    global _version_value, _version_checked_at
+    with _version_lock:
+        changed = version != _version_value
+        _version_value = version
+        _version_checked_at = time.monotonic()
+    if changed:
+        _query_cache.clear()
+
+
+def get_data_version(*, max_age: float = DATA_VERSION_POLL) -> int:
+    """
+    Current data version. Served from memory unless the last DB check is
+    older than *max_age* seconds. Returns 0 if the marker table is missing.
+    """
+    if time.monotonic() - _version_checked_at < max_age:
+        return _version_value
+    try:
+        rows = shared_query(                 # every session polls at once
+            "SELECT version FROM data_version WHERE id = 1;", name="data_version"
+        )
+        version = rows[0]["version"] if rows else 0
+    except pg_errors.UndefinedTable:
+        version = 0
+    _note_version(version)
+    return version
+
+
+def bump_data_version() -> int:
+    """Increment the data version (creating the marker table if needed)."""
+    rows = execute_query(
+        _CREATE_VERSION_TABLE
+        + """
+        INSERT INTO data_version (id, version) VALUES (1, 1)
+        ON CONFLICT (id) DO UPDATE
+          SET version = data_version.version + 1, updated_at = now()
+        RETURNING version;
+        """,
+        fetch=True,
+    )
+    version = rows[0]["version"]
+    _note_version(version)
+    return version
+
+# ---------------------------------------------------------------------
+# Listing view
+# ---------------------------------------------------------------------
+# The search preview and the name index both want the same thing: one row
+# per tree name (the lowest id), alphabetical. tree_listing precomputes it;
+# writers refresh it after changing tree_data. The unique index on id is
+# what REFRESH … CONCURRENTLY needs to swap rows without blocking readers.
+LISTING_VIEW = "tree_listing"
+
+_CREATE_LISTING_VIEW = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {LISTING_VIEW} AS
+SELECT DISTINCT ON (tree_name)
+       id, tree_name, scientific_name, image_path
+FROM tree_data
+ORDER BY tree_name, id;
+CREATE UNIQUE INDEX IF NOT EXISTS {LISTING_VIEW}_id_idx
+  ON {LISTING_VIEW} (id);
+CREATE UNIQUE INDEX IF NOT EXISTS {LISTING_VIEW}_name_id_idx
+  ON {LISTING_VIEW} (tree_name, id);
+ANALYZE {LISTING_VIEW};
+"""
+
+
+def create_listing_view() -> None:
+    """Create (or keep) the tree_listing materialized view and its indexes."""
+    execute_query(_CREATE_LISTING_VIEW)
+
+
+def refresh_listing() -> bool:
+    """
+    Refresh tree_listing without blocking readers. Returns False (and does
+    nothing) if the view has not been created yet.
+    """
+    try:
+        execute_query(
+            f"REFRESH MATERIALIZED VIEW CONCURRENTLY {LISTING_VIEW};", name="refresh_listing"
+        )
+    except pg_errors.UndefinedTable:
+        return False
+    return True
+
+# ---------------------------------------------------------------------
+# Shared query-result cache
+# ---------------------------------------------------------------------
+_query_cache = LRUCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=QUERY_CACHE_MAX_BYTES,
+    ttl=QUERY_CACHE_TTL,
+)
+
+
+def _freeze(params: Optional[tuple | list | dict]) -> Any:
+    """Hashable form of query params for use in a cache key."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(_freeze(p) for p in params)
+    return params
+
+
+def cached_query(
+    query: str,
+    params: Optional[tuple | list | dict] = None,
+    *,
+    ttl: Optional[float] = None,
+    name: Optional[str] = None,
+) -> List[Any]:
+    """
+    Like execute_query(fetch=True) but answered from a process-wide cache
+    shared by all sessions. Entries live for *ttl* seconds (default
+    QUERY_CACHE_TTL) and are dropped when the data version changes.
+    The returned rows are shared – treat them as read-only.
+    """
+    key = (query, _freeze(params), get_data_version())
+    rows = _query_cache.get(key)
+    if rows is None:
+        rows = shared_query(query, params, name=name)
+        if ttl is None:
+            _query_cache.set(key, rows)
+        else:
+            _query_cache.set(key, rows, ttl=ttl)
+    return rows
+
+
+def clear_query_cache() -> None:
+    _query_cache.clear()
+
+
+def query_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters plus current entries and bytes."""
+    return {**_query_cache.stats(), "data_version": _version_value}
+
+
+# ---------------------------------------------------------------------
+# Request coalescing
+# ---------------------------------------------------------------------
+# A burst of sessions asking for the same page (after a deploy, a cache
+# expiry or a data-version bump) would otherwise send N identical queries.
+_inflight = SingleFlight()
+
+
+def shared_query(
+    query: str,
+    params: Optional[tuple | list | dict] = None,
+    *,
+    name: Optional[str] = None,
+) -> List[Any]:
+    """
+    execute_query(fetch=True) for READ-ONLY statements, coalesced on
+    (query, params): while an identical call is in flight, concurrent
+    callers wait for it and get the same rows instead of querying again.
+    The returned rows are shared – treat them as read-only.
+    """
+    return _inflight.do(
+        (query, _freeze(params)),
+        lambda: execute_query(query, params, fetch=True, name=name),
+    )
+
+
+def coalesce_stats() -> Dict[str, int]:
+    """executed vs coalesced shared_query() calls, and calls in flight."""
+    return _inflight.stats()
+
+
+def _metrics_gauges() -> Dict[str, float]:
+    out = {f"query_cache_{k}": v for k, v in query_cache_stats().items()}
+    out.update({f"db_coalesce_{k}": v for k, v in coalesce_stats().items()})
+    if _pool is not None:                    # never open a pool just to report
+        out.update({f"db_pool_{k}": v for k, v in _pool.stats().items()})
+    if _read_pools:
+        out.update({f"db_read_pool_{k}": v for k, v in read_pool_stats().items()})
+    return out
+
+
+metrics.register_collector(_metrics_gauges)
 
 # ---------------------------------------------------------------------
 # CLI utilities
@@ -94,6 +1015,26 @@ if __name__ == "__main__":
         action="store_true",
         help="Remove duplicate tree rows and add UNIQUE constraint",
     )
+    parser.add_argument(
+        "--create-trigram-indexes",
+        action="store_true",
+        help="Enable pg_trgm and add GIN trigram indexes on the name columns",
+    )
+    parser.add_argument(
+        "--create-catalog-index",
+        action="store_true",
+        help="Add the (tree_name, id) index used by catalog pagination",
+    )
+    parser.add_argument(
+        "--create-listing-view",
+        action="store_true",
+        help="Create the tree_listing materialized view used by listing queries",
+    )
+    parser.add_argument(
+        "--bump-data-version",
+        action="store_true",
+        help="Invalidate cached query results on every app server",
+    )
     args = parser.parse_args()
 
     if args.cleanup_duplicates:
@@ -138,9 +1079,43 @@ if __name__ == "__main__":
             """
         )
 
+        bump_data_version()
         print("✅  Done! Duplicates removed and UNIQUE constraint added.")
 
+    elif args.create_trigram_indexes:
+        print("🔄  Creating trigram indexes on tree_data…")
+        execute_query(
+            """
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            CREATE INDEX IF NOT EXISTS tree_data_tree_name_trgm
+              ON tree_data USING gin (tree_name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS tree_data_scientific_name_trgm
+              ON tree_data USING gin (scientific_name gin_trgm_ops);
+            ANALYZE tree_data;
+            """
+        )
+        print("✅  Done! Set TREE_SEARCH_BACKEND=db to search through them.")
+
+    elif args.create_catalog_index:
+        execute_query(
+            """
+            CREATE INDEX IF NOT EXISTS tree_data_name_id_idx
+              ON tree_data (tree_name, id);
+            """
+        )
+        print("✅  Catalog index ready.")
+
+    elif args.create_listing_view:
+        print(f"🔄  Creating materialized view {LISTING_VIEW}…")
+        create_listing_view()
+        bump_data_version()          # app servers switch to the view on next poll
+        print("✅  Listing view ready – refreshed by the sync scripts from now on.")
+
+    elif args.bump_data_version:
+        print("✅  Data version is now", bump_data_version())
+
     else:
         # Default: simple connectivity test
         result = execute_query("SELECT current_database();", fetch=True)
         print("Connected to:", result[0]["current_database"])
+        print("Pool:", pool_stats())
@@ -1,30 +1,50 @@
 # header.py
 """
 Shows Hasar logo (left) and Government logo (right) on every page.
-Also pulls Git-LFS objects once per container session so images work.
+The first show() in a process also starts the background Git-LFS pull and
+cache warm-up (for sessions that land on a page directly, without app.py)
+and the optional /metrics endpoint; later calls skip that. Until a logo
+has arrived a small placeholder is shown instead.
 """
 
 import streamlit as st
 from pathlib import Path
 from PIL import UnidentifiedImageError
 
-# --- pull Git-LFS blobs once ----------------------------------------
 import lfs_bootstrap
-lfs_bootstrap.ensure_lfs_pulled()     # << NEW: runs on every page
+import metrics
+import warmup
+from image_cache import load_image
 
 # --------------------------------------------------------------------
 _ASSETS = Path(__file__).parent / "assets"
+LOGO_WIDTH = 120                     # px; warmup.py caches the logos at this size
+_started = False
+
+def _start_background_once():
+    """LFS pull, warm-up + /metrics endpoint, once per process (not per page/rerun)."""
+    global _started
+    if not _started:
+        _started = True
+        lfs_bootstrap.ensure_lfs_pulled()     # background, non-blocking
+        warmup.start()                        # background, non-blocking
+        metrics.serve_from_env()              # /metrics on METRICS_PORT, if set
 
 def _safe_image(path: Path, *, width: int | None = None):
     try:
-        st.image(path, width=width)
+        st.image(load_image(path, width=width), width=width)   # sent as-is
     except (FileNotFoundError, UnidentifiedImageError):
-        st.write(f"*(missing {path.name})*")
+        if lfs_bootstrap.is_pointer(path):
+            st.write("*(loading…)*")
+        else:
+            st.write(f"*(missing {path.name})*")
 
 def show():
     """Render logos."""
-    col_left, col_center, col_right = st.columns([0.15, 0.7, 0.15])
-    with col_left:
-        _safe_image(_ASSETS / "hasar_logo.png", width=120)
-    with col_right:
-        _safe_image(_ASSETS / "gov_logo.png", width=120)
+    _start_background_once()
+    with metrics.timer("render_seconds", component="header"):
+        col_left, col_center, col_right = st.columns([0.15, 0.7, 0.15])
+        with col_left:
+            _safe_image(_ASSETS / "hasar_logo.png", width=LOGO_WIDTH)
+        with col_right:
+            _safe_image(_ASSETS / "gov_logo.png", width=LOGO_WIDTH)
@@ -0,0 +1,101 @@
+# image_cache.py
+"""
+Process-wide cache of image bytes shared by every session.
+
+header.show() and image_utils.show_tree_image() read logos/thumbnails
+through load_image(), so hot images are served from memory instead of being
+re-read from disk on every rerun. The cached bytes are already what
+st.image() sends – JPEG/PNG/GIF no wider than the display width – so it
+passes them through instead of decoding, resizing and re-encoding the image
+on every call. Entries are keyed on (path, mtime, width) – an edited file
+gets a fresh entry – and the cache is LRU-bounded by bytes.
+"""
+
+import os
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import metrics
+from cache_utils import LRUCache
+
+IMAGE_CACHE_MAX_BYTES: int = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Re-stat a cached path at most this often (seconds) to notice edits.
+IMAGE_STAT_INTERVAL: float = float(os.getenv("IMAGE_STAT_INTERVAL", "10"))
+# Formats st.image() sends unchanged (anything else it re-encodes).
+ST_IMAGE_FORMATS = {"JPEG", "PNG", "GIF"}
+
+_cache = LRUCache(max_bytes=IMAGE_CACHE_MAX_BYTES, sizeof=len)
+
+_mtimes: Dict[str, Tuple[float, int]] = {}   # path -> (checked_at, mtime_ns)
+_mtimes_lock = threading.Lock()
+
+
+def _mtime_ns(path: str) -> int:
+    now = time.monotonic()
+    with _mtimes_lock:
+        seen = _mtimes.get(path)
+    if seen and now - seen[0] < IMAGE_STAT_INTERVAL:
+        return seen[1]
+    mtime = os.stat(path).st_mtime_ns          # FileNotFoundError propagates
+    with _mtimes_lock:
+        _mtimes[path] = (now, mtime)
+    return mtime
+
+
+def _for_st_image(data: bytes, width: Optional[int]) -> bytes:
+    """*data* as st.image(…, width=*width*) would send it, converted once here."""
+    from PIL import Image, ImageOps              # lazy: ~50 ms off the cold start
+
+    from thumbnails import for_st_image
+
+    with Image.open(BytesIO(data)) as im:
+        if im.format in ST_IMAGE_FORMATS and (width is None or im.width <= width):
+            im.verify()                          # header-only decode check
+            return data
+        im = ImageOps.exif_transpose(im)
+        if width is not None and im.width > width:
+            im = im.resize((width, max(1, round(im.height * width / im.width))), Image.LANCZOS)
+        im, fmt = for_st_image(im)
+        out = BytesIO()
+        if fmt == "JPEG":
+            im.save(out, fmt, quality=90)        # what st.image itself would use
+        else:
+            im.save(out, fmt)
+        return out.getvalue()
+
+
+def load_image(path: Path | str, *, width: Optional[int] = None) -> bytes:
+    """
+    Encoded bytes of the image at *path*, ready for st.image(…, width=*width*)
+    to send without re-encoding (pass the same width to both).
+    Raises FileNotFoundError / UnidentifiedImageError like PIL would, so
+    callers keep their existing placeholders (LFS pointers fail here too).
+    """
+    path = os.fspath(path)
+    key = (path, _mtime_ns(path), width)
+    data = _cache.get(key)
+    if data is None:
+        with open(path, "rb") as fh:
+            data = _for_st_image(fh.read(), width)
+        _cache.set(key, data)
+    return data
+
+
+def image_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters plus current entries and bytes."""
+    return _cache.stats()
+
+
+metrics.register_collector(
+    lambda: {f"image_cache_{k}": v for k, v in image_cache_stats().items()}
+)
+
+
+def clear_image_cache() -> None:
+    _cache.clear()
+    with _mtimes_lock:
+        _mtimes.clear()
+
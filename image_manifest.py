@@ -0,0 +1,184 @@
+# image_manifest.py
+"""
+On-disk manifest of the tree images: path, size, mtime, content hash, and
+whether the file really is a decodable image (not a Git-LFS pointer or a
+truncated upload), plus a perceptual hash to spot duplicate photos.
+
+scan() only opens files that are new or changed since the last run
+(size/mtime differ from the manifest); those are checked in a process
+pool, everything else comes straight from the manifest. Used by
+scripts/fill_image_paths.py.
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from lfs_bootstrap import is_pointer
+
+REPO_ROOT = Path(__file__).resolve().parent
+IMG_DIR = REPO_ROOT / "assets" / "tree_images"
+MANIFEST_PATH = Path(
+    os.getenv("IMAGE_MANIFEST", REPO_ROOT / ".cache" / "image_manifest.json")
+)
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+# Max differing dHash bits for two photos to count as the same picture.
+DUPLICATE_DISTANCE = int(os.getenv("IMAGE_DUPLICATE_DISTANCE", "6"))
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+Entry = Dict[str, Any]   # size, mtime_ns, sha256, ok, error, dhash, width, height
+
+
+# ---------------------------------------------------------------------
+# Per-file inspection (runs in worker processes)
+# ---------------------------------------------------------------------
+def dhash(im, size: int = 8) -> str:
+    """64-bit difference hash: survives resizing and recompression."""
+    from PIL import Image
+
+    small = im.convert("L").resize((size + 1, size), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = px[row * (size + 1) + col]
+            bits = (bits << 1) | (left > px[row * (size + 1) + col + 1])
+    return f"{bits:016x}"
+
+
+def inspect(path: str) -> Entry:
+    """Hash, decode and fingerprint one image file."""
+    from PIL import Image
+
+    entry: Entry = {"sha256": None, "ok": False, "error": None, "dhash": None}
+    if is_pointer(path):
+        entry["error"] = "Git-LFS pointer (run `git lfs pull`)"
+        return entry
+    try:
+        data = Path(path).read_bytes()
+    except OSError as e:                               # permissions, vanished, I/O error
+        entry["error"] = f"unreadable: {e}"
+        return entry
+    entry["sha256"] = hashlib.sha256(data).hexdigest()[:20]
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            im.load()                                  # full decode, not just the header
+            entry.update(ok=True, dhash=dhash(im), width=im.width, height=im.height)
+    except Exception as e:                             # PIL raises many kinds
+        entry["error"] = f"not decodable: {e}"
+    return entry
+
+
+# ---------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------
+def load(path: Path = MANIFEST_PATH) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {"files": {}, "state": {}}
+
+
+def save(manifest: Dict[str, Any], path: Path = MANIFEST_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def scan(
+    manifest: Dict[str, Any],
+    img_dir: Path = IMG_DIR,
+    *,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Bring manifest["files"] (keyed by repo-relative POSIX path) in line
+    with *img_dir*. Returns counts: unchanged, inspected, removed.
+    """
+    old: Dict[str, Entry] = manifest.get("files", {})
+    files: Dict[str, Entry] = {}
+    todo: Dict[str, os.stat_result] = {}
+
+    for img in sorted(Path(img_dir).resolve().glob("*")):
+        if img.suffix.lower() not in IMAGE_SUFFIXES or not img.is_file():
+            continue
+        rel = img.relative_to(REPO_ROOT).as_posix()
+        st = img.stat()
+        entry = old.get(rel)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            files[rel] = entry
+        else:
+            todo[rel] = st
+
+    if todo:
+        paths = [str(REPO_ROOT / rel) for rel in todo]
+        if len(paths) == 1:
+            results = [inspect(paths[0])]
+        else:
+            chunk = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(inspect, paths, chunksize=chunk))
+        for (rel, st), entry in zip(todo.items(), results):
+            files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, **entry}
+
+    manifest["files"] = files
+    return {
+        "unchanged": len(files) - len(todo),
+        "inspected": len(todo),
+        "removed": len(set(old) - set(files)),
+    }
+
+
+def duplicates(
+    manifest: Dict[str, Any], *, max_distance: int = DUPLICATE_DISTANCE
+) -> List[List[str]]:
+    """
+    Groups (≥2) of valid images whose perceptual hashes differ in at most
+    *max_distance* bits. Hashes are split into 8 bands of 8 bits: two hashes
+    within 7 bits share at least one whole band, so only images sharing a
+    band are compared instead of every pair.
+    """
+    if not 0 <= max_distance < 8:
+        raise ValueError(
+            f"duplicate distance must be 0–7, got {max_distance} "
+            "(IMAGE_DUPLICATE_DISTANCE; the band lookup only finds distances below 8)"
+        )
+    entries = [
+        (rel, int(e["dhash"], 16))
+        for rel, e in sorted(manifest.get("files", {}).items())
+        if e.get("ok")
+    ]
+    parent = list(range(len(entries)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    hashes = np.array([h for _, h in entries], dtype=np.uint64)
+    buckets: Dict[tuple, List[int]] = {}
+    for i, (_, h) in enumerate(entries):
+        for band in range(8):
+            buckets.setdefault((band, (h >> (band * 8)) & 0xFF), []).append(i)
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        idx = np.array(members)
+        xor = hashes[idx][:, None] ^ hashes[idx][None, :]          # all pairs at once
+        dist = _POPCOUNT[xor.view(np.uint8)].reshape(len(idx), len(idx), 8).sum(-1)
+        for a, b in zip(*np.nonzero(np.triu(dist <= max_distance, k=1))):
+            parent[find(int(idx[b]))] = find(int(idx[a]))
+
+    groups: Dict[int, List[str]] = {}
+    for i, (rel, _) in enumerate(entries):
+        groups.setdefault(find(i), []).append(rel)
+    return [g for g in groups.values() if len(g) > 1]
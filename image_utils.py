@@ -3,20 +3,33 @@ from pathlib import Path
 import streamlit as st
 from PIL import UnidentifiedImageError
 
+import metrics
+from image_cache import load_image
+from lfs_bootstrap import is_pointer
+from thumbnails import DETAIL_WIDTH, display_thumbnail_path
+
 REPO_ROOT = Path(__file__).parent          # krg-tree-index/
 
-def show_tree_image(rel_path: str, *, width: int = 250) -> None:
+def show_tree_image(rel_path: str, *, width: int = DETAIL_WIDTH) -> None:
     """
     Display an image from a relative path (assets/…).
-    If the file is missing or unreadable, show a placeholder.
+    A cached JPEG/PNG thumbnail exactly *width* wide is shown instead of the
+    original when one can be built, so st.image() sends its bytes as they
+    are; they come from the shared image cache.
+    If the file is missing or unreadable, show a placeholder (a "loading"
+    one while Git-LFS is still fetching it).
     """
     if not rel_path:
         st.caption("*(no image)*")
         return
 
     path = REPO_ROOT / rel_path
-    try:
-        st.image(path, width=width)
-    except (FileNotFoundError, UnidentifiedImageError):
-        st.caption(f"*(image not found: {rel_path})*")
-
+    with metrics.timer("render_seconds", component="tree_image"):
+        try:
+            src = display_thumbnail_path(path, width) or path
+            st.image(load_image(src, width=width), width=width)
+        except (FileNotFoundError, UnidentifiedImageError):
+            if is_pointer(path):
+                st.caption("*(image loading…)*")
+            else:
+                st.caption(f"*(image not found: {rel_path})*")
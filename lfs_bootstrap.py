@@ -1,35 +1,133 @@
-# lfs_bootstrap.py
 """
 Pull Git-LFS files (images) the first time a Streamlit session starts.
 
 Why?  On Streamlit Cloud (and any fresh container) `git clone`
 fetches only small pointer files.  We need to do `git lfs pull`
 once so real PNG/JPG bytes are present for st.image().
+
+The pull runs in a background thread so it never blocks the first page
+render, and in stages so the small header logos land before the tree
+images and the spreadsheet under data/ comes last. Pages show a placeholder for any file that is still a pointer
+(see is_pointer()). Completion is remembered per commit, so a redeploy of
+a new commit pulls again while reruns of the same one don't.
+
+Env:
+    LFS_EXCLUDE  – comma-separated patterns never pulled (default: none)
 """
 
 from pathlib import Path
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 
-def ensure_lfs_pulled() -> None:
-    repo_root = Path(__file__).resolve().parent
-    marker = Path("/tmp/lfs_done")
+REPO_ROOT = Path(__file__).resolve().parent
+MARKER_DIR = Path(tempfile.gettempdir()) / "krg_lfs"
+LFS_EXCLUDE = os.getenv("LFS_EXCLUDE", "")
 
-    # Skip if we've already pulled in this container session
-    if marker.exists():
-        return
+# (stage name, include patterns) – pulled in this order
+STAGES = [
+    ("logos", "assets/*.png"),
+    ("tree_images", "assets/tree_images/**"),
+    ("data", "data/**"),                 # the sheet; only the sync scripts read it
+]
 
-    # Only run if repo uses LFS (check .gitattributes for "filter=lfs")
-    gattr = repo_root / ".gitattributes"
-    if not gattr.exists() or "filter=lfs" not in gattr.read_text():
-        return  # nothing to pull
+_POINTER_PREFIX = b"version https://git-lfs"
 
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_status: dict[str, dict] = {name: {"state": "pending"} for name, _ in STAGES}
+_done = {name: threading.Event() for name, _ in STAGES}
+
+
+def is_pointer(path: Path | str) -> bool:
+    """True if *path* is still a Git-LFS pointer file (not the real blob)."""
     try:
-        # Initialize LFS in this repo (local) and pull all objects
-        subprocess.run(["git", "lfs", "install", "--local"], check=True, cwd=repo_root)
-        subprocess.run(["git", "lfs", "pull"], check=True, cwd=repo_root)
-        marker.touch()  # create marker so we don't repeat
-        print("✔️  Git-LFS images pulled.")
+        with open(path, "rb") as fh:
+            return fh.read(len(_POINTER_PREFIX)) == _POINTER_PREFIX
+    except OSError:
+        return False
+
+
+def _uses_lfs() -> bool:
+    gattr = REPO_ROOT / ".gitattributes"
+    return gattr.exists() and "filter=lfs" in gattr.read_text()
+
+
+def _git(*args: str) -> str:
+    out = subprocess.run(
+        ["git", *args], check=True, cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return out.stdout.strip()
+
+
+def _set(stage: str, **fields) -> None:
+    with _lock:
+        _status[stage].update(fields)
+
+
+def _run() -> None:
+    try:
+        commit = _git("rev-parse", "HEAD")
+        _git("lfs", "install", "--local")
     except Exception as e:
-        print("⚠️  Git-LFS pull failed:", e, file=sys.stderr)
+        print("⚠️  Git-LFS unavailable:", e, file=sys.stderr)
+        for name, _ in STAGES:
+            _set(name, state="failed", error=str(e))
+            _done[name].set()
+        return
+
+    MARKER_DIR.mkdir(parents=True, exist_ok=True)
+    for name, include in STAGES:
+        marker = MARKER_DIR / f"{commit}.{name}"
+        if marker.exists():
+            _set(name, state="done", seconds=0.0, cached=True)
+            _done[name].set()
+            continue
+        _set(name, state="running")
+        t0 = time.perf_counter()
+        try:
+            exclude = [f"--exclude={LFS_EXCLUDE}"] if LFS_EXCLUDE else []
+            _git("lfs", "pull", f"--include={include}", *exclude)
+            marker.touch()          # remembered for this commit only
+            _set(name, state="done", seconds=round(time.perf_counter() - t0, 2))
+            print(f"✔️  Git-LFS {name} pulled.")
+        except Exception as e:
+            _set(name, state="failed", error=str(e))
+            print(f"⚠️  Git-LFS pull of {name} failed:", e, file=sys.stderr)
+        finally:
+            _done[name].set()
+
+
+def ensure_lfs_pulled(*, block: bool = False) -> None:
+    """
+    Start the staged background pull (once per process). With block=True,
+    wait until every stage has finished.
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            if _uses_lfs():
+                _thread = threading.Thread(target=_run, name="lfs-pull", daemon=True)
+                _thread.start()
+            else:                   # nothing to pull
+                _thread = threading.current_thread()
+                for name, _ in STAGES:
+                    _status[name].update(state="done")
+                    _done[name].set()
+    if block:
+        for event in _done.values():
+            event.wait()
+
+
+def wait(stage: str, timeout: float | None = None) -> bool:
+    """Block until *stage* finished (pulled or failed); False on timeout."""
+    return _done[stage].wait(timeout)
+
 
+def status() -> dict[str, dict]:
+    """Per-stage state (pending/running/done/failed) and timings."""
+    with _lock:
+        return {name: dict(info) for name, info in _status.items()}
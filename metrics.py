@@ -0,0 +1,237 @@
+# metrics.py
+"""
+Tiny in-process metrics registry (no external dependency).
+
+• observe()/timer()  – latency histograms, tagged with labels
+                       (db queries by query name, page reruns, rendering)
+• inc()              – counters
+• register_collector – callbacks that report gauges at scrape time
+                       (pool / cache stats)
+• slow queries above SLOW_QUERY_MS are logged and kept for the admin page
+• render_prometheus() – Prometheus text format; served on METRICS_PORT
+                        when set, and shown on the Metrics admin page
+
+With METRICS_ENABLED=0 every hook returns immediately.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+ENABLED: bool = os.getenv("METRICS_ENABLED", "1") != "0"
+SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "500"))
+METRICS_PORT: Optional[int] = int(os.environ["METRICS_PORT"]) if os.getenv("METRICS_PORT") else None
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+log = logging.getLogger("krg.metrics")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, Labels], List] = {}   # -> [bucket counts, sum, count]
+_counters: Dict[Tuple[str, Labels], float] = {}
+_collectors: List[Callable[[], Dict[str, float]]] = []
+slow_queries: deque = deque(maxlen=50)              # (unix time, name, ms, sql)
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+# ---------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------
+def observe(name: str, seconds: float, **labels: object) -> None:
+    """Add one *seconds* sample to histogram *name*{labels}."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    idx = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        h[0][idx] += 1
+        h[1] += seconds
+        h[2] += 1
+
+
+def inc(name: str, value: float = 1, **labels: object) -> None:
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+@contextmanager
+def timer(name: str, **labels: object):
+    """Time the with-block into histogram *name*{labels}."""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+def observe_query(name: Optional[str], seconds: float, sql: str) -> None:
+    """Record a DB query; log it when slower than SLOW_QUERY_MS."""
+    name = name or "unnamed"
+    observe("db_query_seconds", seconds, query=name)
+    ms = seconds * 1000
+    if ms >= SLOW_QUERY_MS:
+        text = " ".join(sql.split())[:300]
+        slow_queries.append((time.time(), name, round(ms, 1), text))
+        log.warning("slow query %s took %.0f ms: %s", name, ms, text)
+
+
+# Raised by st.rerun() / st.switch_page() and st.stop() to end a rerun early.
+_CONTROL_FLOW = {"RerunException", "StopException"}
+
+
+@contextmanager
+def page_timer(page: str):
+    """
+    Wrap a page script: times the rerun into page_rerun_seconds{page,
+    status}. Reruns cut short by st.rerun() / st.switch_page() / st.stop()
+    count as status=ok; any other exception as status=error.
+    """
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        if type(e).__name__ not in _CONTROL_FLOW:
+            status = "error"
+        raise
+    finally:
+        observe("page_rerun_seconds", time.perf_counter() - t0, page=page, status=status)
+
+
+def register_collector(fn: Callable[[], Dict[str, float]]) -> None:
+    """*fn* returns {metric_name: value} gauges, evaluated at scrape time."""
+    _collectors.append(fn)
+
+# ---------------------------------------------------------------------
+# Reading / export
+# ---------------------------------------------------------------------
+def _fmt_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def gauges() -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for fn in _collectors:
+        try:
+            out.update(fn())
+        except Exception as e:          # a broken collector must not break scraping
+            log.debug("collector %r failed: %s", fn, e)
+    return out
+
+
+def summary() -> List[Dict[str, object]]:
+    """One row per histogram: count, mean and p50/p99 (bucket upper bound, ms)."""
+    with _lock:
+        items = [(k, [list(h[0]), h[1], h[2]]) for k, h in _histograms.items()]
+    rows = []
+    for (name, labels), (buckets, total, count) in sorted(items):
+        def quantile(q: float) -> float:
+            target, seen = q * count, 0
+            for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+                seen += n
+                if seen >= target:
+                    return bound
+            return float("inf")
+
+        rows.append({
+            "metric": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "count": count,
+            "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+            "p50_ms": quantile(0.50) * 1000,
+            "p99_ms": quantile(0.99) * 1000,
+        })
+    return rows
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    with _lock:
+        hists = sorted((k, [list(h[0]), h[1], h[2]]) for k, h in _histograms.items())
+        counters = sorted(_counters.items())
+    seen = set()
+    for (name, labels), (buckets, total, count) in hists:
+        if name not in seen:
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, buckets):
+            cumulative += n
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', repr(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total:.6f}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+    for (name, labels), value in counters:
+        if name not in seen:
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    for name, value in sorted(gauges().items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+# ---------------------------------------------------------------------
+# Optional /metrics HTTP endpoint
+# ---------------------------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):                                    # noqa: N802
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):                        # keep stderr quiet
+        pass
+
+
+_server_started = False
+
+
+def serve_from_env() -> None:
+    """Start the /metrics endpoint on METRICS_PORT once per process."""
+    global _server_started
+    with _lock:
+        if _server_started or not (ENABLED and METRICS_PORT):
+            return
+        _server_started = True
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), _Handler)
+    except OSError as e:                 # another process already serves it
+        log.warning("metrics endpoint not started on :%s (%s)", METRICS_PORT, e)
+        return
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
@@ -0,0 +1,272 @@
+# name_index.py
+"""
+In-process name index for search-as-you-type.
+
+All common + scientific names are loaded once (through the shared query
+cache) into
+
+• a prefix trie over every word of every name, and
+• character-trigram postings per name and per word (pg_trgm style: each
+  word padded on its own),
+
+so the Tree Search page can answer substring, prefix and typo-tolerant
+queries without a database round trip per keystroke. The index is rebuilt
+automatically when db_handler's data version changes.
+
+Usage:
+    from name_index import search_names
+    rows = search_names("oak")   # -> list[dict(id, tree_name, scientific_name)]
+"""
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+# Rank weights – higher wins; ties are broken alphabetically.
+_EXACT = 4.0
+_NAME_PREFIX = 3.0
+_WORD_PREFIX = 2.0
+_SUBSTRING = 1.0
+
+FUZZY_THRESHOLD = 0.3               # minimum trigram similarity for typos
+
+_NAMES_SQL = """
+SELECT DISTINCT ON (tree_name)
+       id, tree_name, scientific_name
+FROM tree_data
+ORDER BY tree_name, id;
+"""
+
+
+def normalize(text: Optional[str]) -> str:
+    """'  Christ’s Thorn  Jujube ' -> 'christ’s thorn jujube' (accents removed)."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Trigrams of an already-normalized string, like pg_trgm: every word is
+    padded on its own ('  oak ', '  tree '), so no trigram spans two words.
+    """
+    grams: set[str] = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _TrieNode:
+    __slots__ = ("children", "docs")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.docs: set[int] = set()
+
+
+class NameIndex:
+    """
+    Immutable index over rows with id / tree_name / scientific_name.
+    Rows are kept in the shape the page expects and returned as-is.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self.rows: List[Dict[str, Any]] = list(rows)
+        self._sort_key: List[str] = [normalize(r["tree_name"]) for r in self.rows]
+
+        # One "entry" per searchable name; several entries map to one row.
+        self._entries: List[str] = []
+        self._entry_doc: List[int] = []
+        self._entry_tri: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        # Distinct words of all names, for word-level typo matching.
+        self._word_ids: Dict[str, int] = {}
+        self._word_tri: List[int] = []
+        self._word_entries: List[List[int]] = []
+        self._word_postings: Dict[str, List[int]] = {}
+        self._trie = _TrieNode()
+
+        for doc, row in enumerate(self.rows):
+            for field in ("tree_name", "scientific_name"):
+                name = normalize(row.get(field))
+                if not name:
+                    continue
+                entry = len(self._entries)
+                self._entries.append(name)
+                self._entry_doc.append(doc)
+                grams = trigrams(name)
+                self._entry_tri.append(len(grams))
+                for g in grams:
+                    self._postings.setdefault(g, []).append(entry)
+                for word in set(_WORD.findall(name)):
+                    self._add_word(word, entry)
+                for word in name.split(" "):
+                    self._insert_word(word, doc)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # -- building -------------------------------------------------------
+    def _add_word(self, word: str, entry: int) -> None:
+        wid = self._word_ids.get(word)
+        if wid is None:
+            wid = self._word_ids[word] = len(self._word_tri)
+            grams = trigrams(word)
+            self._word_tri.append(len(grams))
+            self._word_entries.append([])
+            for g in grams:
+                self._word_postings.setdefault(g, []).append(wid)
+        self._word_entries[wid].append(entry)
+
+    def _insert_word(self, word: str, doc: int) -> None:
+        node = self._trie
+        for ch in word:
+            node = node.children.setdefault(ch, _TrieNode())
+            node.docs.add(doc)
+
+    # -- lookups --------------------------------------------------------
+    def prefix_docs(self, prefix: str) -> set[int]:
+        """Rows having any word that starts with *prefix* (normalized)."""
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.docs
+
+    @staticmethod
+    def _shared(postings: Dict[str, List[int]], grams: set[str]) -> Counter:
+        """id -> number of trigrams shared with the query."""
+        shared: Counter = Counter()
+        for g in grams:
+            for i in postings.get(g, ()):
+                shared[i] += 1
+        return shared
+
+    def _similarities(self, q_grams: set[str]) -> Dict[int, float]:
+        """
+        entry -> trigram similarity to the query: the better of the whole
+        name (pg_trgm similarity) and its best-matching single word (as
+        word_similarity does), so 'poplr' finds 'black poplar'.
+        """
+        n_q = len(q_grams)
+        sims: Dict[int, float] = {}
+        for entry, common in self._shared(self._postings, q_grams).items():
+            sims[entry] = common / (n_q + self._entry_tri[entry] - common)
+        for wid, common in self._shared(self._word_postings, q_grams).items():
+            sim = common / (n_q + self._word_tri[wid] - common)
+            for entry in self._word_entries[wid]:
+                if sim > sims.get(entry, 0.0):
+                    sims[entry] = sim
+        return sims
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: Optional[int] = 50,
+        fuzzy: bool = True,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for *query*: exact > whole-name prefix > word prefix
+        > substring > fuzzy (trigram similarity ≥ *threshold*).
+        """
+        q = normalize(query)
+        if not q:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        def offer(doc: int, score: float) -> None:
+            if score > scores.get(doc, 0.0):
+                scores[doc] = score
+
+        # Word prefixes via the trie (only meaningful for one-word queries,
+        # multi-word queries are caught by the substring pass below).
+        if " " not in q:
+            for doc in self.prefix_docs(q):
+                offer(doc, _WORD_PREFIX)
+
+        # Substring / exact / whole-name prefix. A substring match contains
+        # every inner trigram of the query that lies within one word, so
+        # postings give us a candidate list; queries without one (shorter
+        # than 3 letters, "a b") just scan the entries.
+        inner = {q[i:i + 3] for i in range(len(q) - 2)}
+        inner = {g for g in inner if not _WORD.sub("", g)}
+        pool: Iterable[int] = (
+            self._candidate_entries(inner) if inner else range(len(self._entries))
+        )
+
+        for entry in pool:
+            name = self._entries[entry]
+            pos = name.find(q)
+            if pos < 0:
+                continue
+            doc = self._entry_doc[entry]
+            if name == q:
+                offer(doc, _EXACT)
+            elif pos == 0:
+                offer(doc, _NAME_PREFIX)
+            else:
+                offer(doc, _SUBSTRING)
+
+        # Typo tolerance: Jaccard similarity on trigrams, kept below any
+        # literal match so "oka" never outranks a real "oak".
+        if fuzzy:
+            for entry, sim in self._similarities(trigrams(q)).items():
+                if sim >= threshold:
+                    offer(self._entry_doc[entry], sim * _SUBSTRING * 0.99)
+
+        ranked = sorted(scores, key=lambda d: (-scores[d], self._sort_key[d]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.rows[d] for d in ranked]
+
+    def _candidate_entries(self, inner: set[str]) -> set[int]:
+        """Entries containing every trigram in *inner* (rarest list first)."""
+        lists = sorted((self._postings.get(g, []) for g in inner), key=len)
+        if not lists or not lists[0]:
+            return set()
+        result = set(lists[0])
+        for lst in lists[1:]:
+            result.intersection_update(lst)
+            if not result:
+                break
+        return result
+
+
+# ---------------------------------------------------------------------
+# Process-wide index, rebuilt when the data version moves
+# ---------------------------------------------------------------------
+_lock = threading.Lock()
+_index: Optional[NameIndex] = None
+_index_version: Optional[int] = None
+
+
+def get_index() -> NameIndex:
+    """Shared NameIndex for the current data version (built on first use)."""
+    global _index, _index_version
+    from tree_queries import all_names, data_version
+
+    version = data_version()
+    if _index is not None and _index_version == version:
+        return _index
+    with _lock:
+        if _index is None or _index_version != version:
+            _index = NameIndex(all_names())
+            _index_version = version
+        return _index
+
+
+def search_names(term: str, *, limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+    """Ranked tree rows whose common or scientific name matches *term*."""
+    return get_index().search(term, limit=limit)
@@ -0,0 +1,88 @@
+"""
+Metrics admin page
+------------------
+Cache warm-up state, latency histograms (DB queries by name, page reruns,
+rendering), the slow-query log, and pool / cache counters of THIS server
+process, plus the same data in Prometheus text format.
+
+Closed unless METRICS_TOKEN is set; then open it with ?token=<METRICS_TOKEN>.
+"""
+
+import hmac
+import os
+from datetime import datetime
+
+import streamlit as st
+
+import header
+import metrics
+import warmup
+
+st.set_page_config(page_title="KRG Tree Index – Metrics", layout="wide")
+header.show()
+
+token = os.getenv("METRICS_TOKEN")
+if not token:
+    st.info("The metrics page is disabled (set METRICS_TOKEN to enable it).")
+    st.stop()
+if not hmac.compare_digest(st.query_params.get("token", ""), token):
+    st.error("Not authorised.")
+    st.stop()
+
+st.title("📈 Metrics")
+if not metrics.ENABLED:
+    st.warning("Metrics are disabled (METRICS_ENABLED=0).")
+    st.stop()
+
+if st.button("🔄 Refresh"):
+    st.rerun()
+
+# ---------------------- warm-up --------------------------------------
+warm = warmup.status()
+st.subheader("Warm-up")
+total = f" in {warm['seconds']:.2f} s" if "seconds" in warm else ""
+st.caption(f"State: **{warm['state']}**{total}")
+if warm["steps"]:
+    st.dataframe(
+        [{"step": name, **info} for name, info in warm["steps"].items()],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+# ---------------------- latency histograms ---------------------------
+st.subheader("Timings")
+rows = metrics.summary()
+if rows:
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+else:
+    st.info("No samples yet – open a page first.")
+
+# ---------------------- slow queries ---------------------------------
+st.subheader(f"Slow queries (≥ {metrics.SLOW_QUERY_MS:.0f} ms)")
+slow = [
+    {
+        "when": datetime.fromtimestamp(ts).strftime("%H:%M:%S"),
+        "query": name,
+        "ms": ms,
+        "sql": sql,
+    }
+    for ts, name, ms, sql in reversed(metrics.slow_queries)
+]
+if slow:
+    st.dataframe(slow, use_container_width=True, hide_index=True)
+else:
+    st.caption("None recorded.")
+
+# ---------------------- pool / cache counters ------------------------
+st.subheader("Pool & caches")
+st.dataframe(
+    [{"gauge": k, "value": v} for k, v in sorted(metrics.gauges().items())],
+    use_container_width=True,
+    hide_index=True,
+)
+
+# ---------------------- Prometheus text ------------------------------
+with st.expander("Prometheus text format"):
+    text = metrics.render_prometheus()
+    st.code(text, language="text")
+    st.download_button("Download", text, file_name="metrics.txt")
@@ -1,71 +1,79 @@
 """
-Tree Catalog page – shows all trees in a 4-column grid with clickable thumbnails.
-Clicking any image jumps to the Tree Search page and opens the selected tree’s
-full details.
+Tree Catalog page – shows all trees in a responsive grid with clickable thumbnails.
+Clicking any card jumps to the Tree Search page (?tree=<id>) and opens the
+selected tree’s full details.
+
+Only one page of trees is fetched and rendered per rerun (keyset pagination
+on tree_name, id); the page size defaults to CATALOG_PAGE_SIZE. The grid is
+sent as ONE html block with lazily loaded, static-served thumbnails
+(see catalog_grid.py).
 """
 
 import streamlit as st
-from image_utils import show_tree_image
+from catalog_grid import catalog_html
 import header
-from db_handler import execute_query
+import metrics
+from tree_queries import CATALOG_PAGE_SIZE, catalog_count, catalog_page, prefetch_details
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Page configuration + top-bar logos
 # ────────────────────────────────────────────────────────────────────────────────
-st.set_page_config(page_title="KRG Tree Index – Tree Catalog", layout="wide")
-header.show()
+with metrics.page_timer("tree_catalog"):   # whole rerun, incl. st.rerun()/st.stop()
+    st.set_page_config(page_title="KRG Tree Index – Tree Catalog", layout="wide")
+    header.show()
 
-st.title("🌲 Tree Catalog")
-st.markdown(
-    "Browse all trees alphabetically. Use **Ctrl + F** (or ⌘ + F) to jump quickly."
-)
+    st.title("🌲 Tree Catalog")
+    st.markdown("Browse all trees alphabetically.")
 
-# ────────────────────────────────────────────────────────────────────────────────
-# Fetch data (include the primary key so we can pass it to the detail page)
-# ────────────────────────────────────────────────────────────────────────────────
-rows = execute_query(
-    """
-    SELECT id, tree_name, scientific_name, image_path
-    FROM tree_data
-    ORDER BY tree_name;
-    """,
-    fetch=True,
-)
+    # ────────────────────────────────────────────────────────────────────────────────
+    # Pagination state: a stack of keyset cursors, one per page visited
+    # ────────────────────────────────────────────────────────────────────────────────
+    PAGE_SIZES = sorted({12, 24, 48, 96, CATALOG_PAGE_SIZE})
 
-# ────────────────────────────────────────────────────────────────────────────────
-# 4-column grid layout
-# ────────────────────────────────────────────────────────────────────────────────
-COLS_PER_ROW = 4
-row_cols = st.columns(COLS_PER_ROW)
+    if "catalog_cursors" not in st.session_state:
+        st.session_state.catalog_cursors = [None]      # None = first page
+
+
+    def _reset_pages():
+        st.session_state.catalog_cursors = [None]
 
-for idx, r in enumerate(rows):
-    # choose the column (0-based) within the current row
-    col = row_cols[idx % COLS_PER_ROW]
 
-    with col:
-        # ── title ───────────────────────────────────────────────────────────────
-        st.subheader(r["tree_name"])
+    page_size = st.selectbox(
+        "Trees per page",
+        PAGE_SIZES,
+        index=PAGE_SIZES.index(CATALOG_PAGE_SIZE),
+        key="catalog_page_size",
+        on_change=_reset_pages,
+    )
 
-        # ── invisible button over the image ────────────────────────────────────
-        clicked = st.button(
-            key=f"img_{r['id']}",
-            label="",                     # empty label keeps the button unseen
-            help="Click for full details",
-        )
-        show_tree_image(r["image_path"], width=140)
+    # ────────────────────────────────────────────────────────────────────────────────
+    # Fetch the visible page only (include the primary key for the detail page)
+    # ────────────────────────────────────────────────────────────────────────────────
+    cursors = st.session_state.catalog_cursors
+    rows, next_cursor = catalog_page(cursors[-1], limit=page_size)
+    prefetch_details((r["id"] for r in rows), limit=page_size)   # instant click-through
 
-        # when clicked → store id in session and switch pages
-        if clicked:
-            st.session_state.selected_tree_id = r["id"]
-            st.switch_page("pages/tree_search.py")   # adjust path if file name differs
+    # ────────────────────────────────────────────────────────────────────────────────
+    # Grid: one html message for the whole page (cards link to ?tree=<id>)
+    # ────────────────────────────────────────────────────────────────────────────────
+    with metrics.timer("render_seconds", component="catalog_grid"):
+        st.html(catalog_html(rows))
 
-        # ── scientific name + divider ──────────────────────────────────────────
-        st.markdown(
-            f"<span style='font-style:italic;'>{r['scientific_name']}</span>",
-            unsafe_allow_html=True,
-        )
-        st.markdown("---")
+    # ────────────────────────────────────────────────────────────────────────────────
+    # Previous / next page
+    # ────────────────────────────────────────────────────────────────────────────────
+    total = catalog_count()
+    page_no = len(cursors)
+    page_count = max(1, -(-total // page_size))
 
-    # ── after filling 4 columns, start a new row ───────────────────────────────
-    if (idx + 1) % COLS_PER_ROW == 0:
-        row_cols = st.columns(COLS_PER_ROW)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if page_no > 1 and st.button("← Previous", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Page {page_no} of {page_count} · {total} trees")
+    with col_next:
+        if next_cursor is not None and st.button("Next →", use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
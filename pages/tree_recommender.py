@@ -0,0 +1,58 @@
+"""
+Tree Recommender page
+---------------------
+Weight the criteria that matter for a site, set minimum scores, and get
+the best-matching species. Ranking runs in memory (recommend.py), so every
+slider move re-ranks instantly without a database round trip.
+"""
+
+import time
+
+import streamlit as st
+
+import header                      # top-bar logos
+import metrics
+from recommend import CRITERIA, SCORE_MAX, rank
+from tree_queries import SCORE_LABELS, prefetch_details
+
+# ---------------------- page config + logos --------------------------
+with metrics.page_timer("tree_recommender"):   # whole rerun, incl. st.rerun()/st.stop()
+    st.set_page_config(page_title="KRG Tree Index – Recommender", layout="wide")
+    header.show()
+
+    st.title("🎯 Tree Recommender")
+    st.markdown(
+        "Give each criterion a **weight** (0 = ignore) and, if needed, a "
+        "**minimum score**. Trees are ranked by their weighted average score."
+    )
+
+    # ---------------------- controls -------------------------------------
+    col_controls, col_results = st.columns([1, 2])
+
+    with col_controls:
+        top_k = st.number_input("Show top", min_value=1, max_value=200, value=20, step=5)
+        weights, minimums = {}, {}
+        for col in CRITERIA:
+            with st.expander(SCORE_LABELS[col], expanded=col in ("climate_adaptation", "water_efficiency")):
+                weights[col] = st.slider("Weight", 0, 5, 1, key=f"w_{col}")
+                minimums[col] = st.slider("Minimum score", 0, int(SCORE_MAX), 0, key=f"min_{col}")
+        minimums["total_score"] = st.slider(
+            SCORE_LABELS["total_score"] + " – minimum",
+            0, int(SCORE_MAX) * len(CRITERIA), 0, key="min_total_score",
+        )
+
+    # ---------------------- ranking --------------------------------------
+    t0 = time.perf_counter()
+    results, n_match = rank(weights, minimums, k=int(top_k))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    prefetch_details(r["id"] for r in results)          # instant click-through
+
+    with col_results:
+        st.caption(f"{n_match} tree(s) meet the minimums · ranked in {elapsed_ms:.1f} ms")
+        if not results:
+            st.info("No tree meets all minimum scores – try lowering some.")
+        for pos, r in enumerate(results, start=1):
+            label = f"{pos}. {r['tree_name']} — {r['scientific_name']}  ·  {r['match']:.1f} / 10"
+            if st.button(label, key=f"rec_{r['id']}", use_container_width=True):
+                st.session_state.selected_tree_id = r["id"]
+                st.switch_page("pages/tree_search.py")
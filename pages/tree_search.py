@@ -5,174 +5,150 @@ Search by common or scientific name. Click a tree to see its image, rating,
 score table, and info paragraphs.
 """
 
+import html
 import os
-from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
 import header                      # top-bar logos
+import metrics
+from db_async import run_concurrently
 from image_utils import show_tree_image
+from thumbnails import DETAIL_WIDTH
+from tree_queries import (
+    SCORE_LABELS,
+    get_tree_detail,
+    prefetch_details,
+    preview_trees,
+    search_trees,
+)
 
 # ---------------------- page config + logos --------------------------
-st.set_page_config(page_title="KRG Tree Index – Tree Search", layout="wide")
-header.show()
-
-# ---------------------- robust db_handler import ---------------------
-try:
-    from db_handler import execute_query
-except ModuleNotFoundError:
-    import importlib.util, sys
-
-    helper_path = Path(__file__).resolve().parent.parent / "db-handler.py"
-    spec = importlib.util.spec_from_file_location("db_handler", helper_path)
-    db_handler = importlib.util.module_from_spec(spec)          # type: ignore
-    sys.modules["db_handler"] = db_handler
-    spec.loader.exec_module(db_handler)                         # type: ignore[arg-type]
-    execute_query = db_handler.execute_query                    # type: ignore[attr-defined]
-
-# ---------------------- secrets override -----------------------------
-if "connections" in st.secrets and "postgres" in st.secrets["connections"]:
-    os.environ["DATABASE_URL"] = st.secrets["connections"]["postgres"]["url"]
-
-# ---------------------- UI intro -------------------------------------
-st.title("🔍 Tree Search")
-st.markdown("Type part of a *common* or *scientific* name, then click a result.")
-
-if "selected_tree_id" not in st.session_state:
-    st.session_state.selected_tree_id = None
-
-search_term = st.text_input("Search:").strip()
+with metrics.page_timer("tree_search"):   # whole rerun, incl. st.rerun()/st.stop()
+    st.set_page_config(page_title="KRG Tree Index – Tree Search", layout="wide")
+    header.show()
+
+    # ---------------------- secrets override -----------------------------
+    if "connections" in st.secrets and "postgres" in st.secrets["connections"]:
+        os.environ["DATABASE_URL"] = st.secrets["connections"]["postgres"]["url"]
+
+    # ---------------------- UI intro -------------------------------------
+    st.title("🔍 Tree Search")
+    st.markdown("Type part of a *common* or *scientific* name, then click a result.")
+
+    if "selected_tree_id" not in st.session_state:
+        st.session_state.selected_tree_id = None
+
+    # Catalog cards link here as ?tree=<id> – open that tree, then drop the
+    # param so "Back to results" isn't overridden on the next rerun.
+    if "tree" in st.query_params:
+        try:
+            st.session_state.selected_tree_id = int(st.query_params["tree"])
+        except ValueError:
+            pass
+        del st.query_params["tree"]
+
+    search_term = st.text_input("Search:").strip()
+
+    col_list, col_detail = (
+        st.columns([1, 2]) if st.session_state.selected_tree_id else st.columns([1, 0.05])
+    )
+
+    # ---------------------- data for this rerun --------------------------
+    # The detail row and the result list are independent – fetch them
+    # concurrently so the rerun waits for the slower one, not both.
+    selected_id = st.session_state.selected_tree_id
+    tree, list_rows = run_concurrently(
+        lambda: get_tree_detail(selected_id) if selected_id else None,
+        lambda: search_trees(search_term) if search_term else preview_trees(),
+    )
+
+    # =====================================================================
+    # DETAIL PANEL
+    # =====================================================================
+    with col_detail:
+        if st.session_state.selected_tree_id:
+            # per-id detail cache; usually warmed by the list prefetch below
+            if tree is None:                       # removed by a later sync
+                st.session_state.selected_tree_id = None
+                st.rerun()
 
-col_list, col_detail = (
-    st.columns([1, 2]) if st.session_state.selected_tree_id else st.columns([1, 0.05])
-)
+            # --- header + rating line ---
+            st.header(tree["tree_name"])
+            st.markdown(f"### Rating: {tree.get('rating', 'N/A')}")
+
+            # --- two-column layout: scores (left) • image (right) ---
+            col_scores, col_image = st.columns([2, 1])
+
+            # ♦ Scores table
+            with col_scores:
+                rows = [
+                    {"Criterion": label, "Score": tree[col]}
+                    for col, label in SCORE_LABELS.items()
+                    if col in tree and tree[col] is not None
+                ]
+                if rows:
+                    # plain HTML table – same look as the old Styler table,
+                    # without importing pandas on the page's hot path
+                    cell = "padding:4px 8px;color:black;font-weight:bold;"
+                    body = "".join(
+                        f"<tr><th style='{cell}text-align:left'>{html.escape(r['Criterion'])}</th>"
+                        f"<td style='{cell}'>{html.escape(str(r['Score']))}</td></tr>"
+                        for r in rows
+                    )
+                    st.markdown(
+                        f"<table><thead><tr><th style='{cell}'>Criterion</th>"
+                        f"<th style='{cell}'>Score</th></tr></thead>"
+                        f"<tbody>{body}</tbody></table>",
+                        unsafe_allow_html=True,
+                    )
+                else:
+                    st.info("No individual scores available.")
+
+            # ♦ Image
+            with col_image:
+                show_tree_image(tree.get("image_path"), width=DETAIL_WIDTH)
+
+            # --- paragraphs below both columns ---
+            st.markdown("---")
+            st.markdown(f"**Information**  \n{tree.get('information', 'N/A')}")
+            st.markdown(f"**Suitability**  \n{tree.get('suitability', 'N/A')}")
+            st.markdown(f"**Challenges**  \n{tree.get('challenges', 'N/A')}")
+            st.markdown("---")
+
+            if st.button("🔙 Back to results"):
+                st.session_state.selected_tree_id = None
+                st.rerun()
 
-# =====================================================================
-# DETAIL PANEL
-# =====================================================================
-with col_detail:
-    if st.session_state.selected_tree_id:
-        tree = execute_query(
-            "SELECT * FROM tree_data WHERE id = %s;",
-            (st.session_state.selected_tree_id,),
-            fetch=True,
-        )[0]
-
-        # --- header + rating line ---
-        st.header(tree["tree_name"])
-        st.markdown(f"### Rating: {tree.get('rating', 'N/A')}")
-
-        # --- two-column layout: scores (left) • image (right) ---
-        col_scores, col_image = st.columns([2, 1])
-
-        # ♦ Scores table
-        with col_scores:
-            score_labels = {
-                "climate_adaptation":       "Climate adaptation",
-                "water_efficiency":         "Water efficiency",
-                "biodiversity_support":     "Biodiversity support",
-                "community_acceptance":     "Community acceptance",
-                "aesthetic_cultural_fit":   "Aesthetic & cultural fit",
-                "shade_public_use":         "Shade / public use",
-                "cost_of_planting":         "Cost of planting",
-                "maintenance_needs":        "Maintenance needs",
-                "lifespan_durability":      "Lifespan & durability",
-                "total_score":              "TOTAL score",
-            }
-            rows = [
-                {"Criterion": label, "Score": tree[col]}
-                for col, label in score_labels.items()
-                if col in tree and tree[col] is not None
-            ]
+    # =====================================================================
+    # LIST PANEL
+    # =====================================================================
+    with col_list:
+        if search_term:
+            # prefix, substring + typo-tolerant matches, best first
+            rows = list_rows
+            prefetch_details(r["id"] for r in rows)     # top hits open instantly
             if rows:
-                df = pd.DataFrame(rows).set_index("Criterion")
-
-                # --- compact padding directly via Styler ---
-                styled = (
-                    df.style
-                    .set_properties(**{"color": "black", "font-weight": "bold"})
-                    .set_table_styles(
-                        [
-                            {
-                                "selector": "th",
-                                "props": [
-                                    ("color", "black"),
-                                    ("font-weight", "bold"),
-                                    ("padding", "4px 8px"),
-                                ],
-                            },
-                            {
-                                "selector": "td",
-                                "props": [("padding", "4px 8px")],
-                            },
-                        ]
-                    )
-                )
-                st.table(styled)
+                st.subheader(f"{len(rows)} result(s)")
+                for r in rows:
+                    if st.button(
+                        f"{r['tree_name']} — {r['scientific_name']}",
+                        key=f"tree_{r['id']}",
+                        use_container_width=True,
+                    ):
+                        st.session_state.selected_tree_id = r["id"]
+                        st.rerun()
             else:
-                st.info("No individual scores available.")
-
-        # ♦ Image
-        with col_image:
-            show_tree_image(tree.get("image_path"), width=240)
-
-        # --- paragraphs below both columns ---
-        st.markdown("---")
-        st.markdown(f"**Information**  \n{tree.get('information', 'N/A')}")
-        st.markdown(f"**Suitability**  \n{tree.get('suitability', 'N/A')}")
-        st.markdown(f"**Challenges**  \n{tree.get('challenges', 'N/A')}")
-        st.markdown("---")
-
-        if st.button("🔙 Back to results"):
-            st.session_state.selected_tree_id = None
-            st.rerun()
-
-# =====================================================================
-# LIST PANEL
-# =====================================================================
-with col_list:
-    if search_term:
-        rows = execute_query(
-            """
-            SELECT DISTINCT ON (tree_name)
-                   id, tree_name, scientific_name
-            FROM tree_data
-            WHERE tree_name ILIKE %s OR scientific_name ILIKE %s
-            ORDER BY tree_name, id;
-            """,
-            (f"%{search_term}%", f"%{search_term}%"),
-            fetch=True,
-        )
-        if rows:
-            st.subheader(f"{len(rows)} result(s)")
-            for r in rows:
+                st.info("No match found.")
+        else:
+            st.info("Start typing to search, or click a random sample ↓")
+            preview = list_rows
+            prefetch_details(r["id"] for r in preview)
+            for r in preview:
                 if st.button(
                     f"{r['tree_name']} — {r['scientific_name']}",
-                    key=f"tree_{r['id']}",
+                    key=f"preview_{r['id']}",
                     use_container_width=True,
                 ):
                     st.session_state.selected_tree_id = r["id"]
                     st.rerun()
-        else:
-            st.info("No match found.")
-    else:
-        st.info("Start typing to search, or click a random sample ↓")
-        preview = execute_query(
-            """
-            SELECT DISTINCT ON (tree_name)
-                   id, tree_name, scientific_name
-            FROM tree_data
-            ORDER BY tree_name
-            LIMIT 25;
-            """,
-            fetch=True,
-        )
-        for r in preview:
-            if st.button(
-                f"{r['tree_name']} — {r['scientific_name']}",
-                key=f"preview_{r['id']}",
-                use_container_width=True,
-            ):
-                st.session_state.selected_tree_id = r["id"]
-                st.rerun()
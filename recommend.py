@@ -0,0 +1,121 @@
+# recommend.py
+"""
+Multi-criteria tree recommendations, computed in memory with NumPy.
+
+All score columns are loaded ONCE per data version into an (n_trees ×
+n_criteria) float matrix. A ranking is then a handful of vectorised ops
+(threshold mask, matrix–vector product, argpartition for the top k), so
+moving a slider re-ranks tens of thousands of species in milliseconds
+without touching the database.
+
+    rank({"water_efficiency": 3, "shade_public_use": 1},
+         minimums={"climate_adaptation": 7}, k=10)
+"""
+
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from tree_queries import SCORE_LABELS, data_version, score_rows
+
+# Criteria the user can weight – every score except the precomputed total,
+# which can still be used as a minimum.
+CRITERIA: Tuple[str, ...] = tuple(c for c in SCORE_LABELS if c != "total_score")
+SCORE_MAX: float = 10.0
+
+
+class ScoreMatrix:
+    """
+    Immutable score matrix over tree rows (id, names, image_path, scores).
+    Missing scores are NaN: they count as 0 in the weighted score and never
+    satisfy a minimum.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.columns: Tuple[str, ...] = tuple(SCORE_LABELS)
+        self._col = {c: j for j, c in enumerate(self.columns)}
+        self.scores = np.array(
+            [[np.nan if r.get(c) is None else r[c] for c in self.columns] for r in rows],
+            dtype=np.float32,
+        ).reshape(len(rows), len(self.columns))
+        self._filled = np.nan_to_num(self.scores, nan=0.0)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _weights(self, weights: Mapping[str, float]) -> np.ndarray:
+        w = np.zeros(len(self.columns), dtype=np.float32)
+        for col, value in weights.items():
+            w[self._col[col]] = value
+        return w
+
+    def _passing(self, minimums: Optional[Mapping[str, float]]) -> np.ndarray:
+        mask = np.ones(len(self.rows), dtype=bool)
+        for col, low in (minimums or {}).items():
+            if low:                                  # 0 = no requirement
+                mask &= self.scores[:, self._col[col]] >= low   # NaN -> False
+        return mask
+
+    def rank(
+        self,
+        weights: Mapping[str, float],
+        minimums: Optional[Mapping[str, float]] = None,
+        *,
+        k: int = 20,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Top *k* rows by weighted mean score (0–10) among the rows meeting
+        every minimum. Returns ([{**row, "match": score}, …], n_matching).
+        """
+        w = self._weights(weights)
+        total_w = float(w.sum())
+        mask = self._passing(minimums)
+        n_match = int(mask.sum())
+        if n_match == 0 or k <= 0:
+            return [], n_match
+
+        if total_w > 0:
+            score = self._filled @ (w / total_w)
+        else:                                        # no weights: plain total
+            score = self._filled[:, self._col["total_score"]] / len(CRITERIA)
+        score = np.where(mask, score, -np.inf)
+
+        k = min(k, n_match)
+        top = np.argpartition(-score, k - 1)[:k] if k < len(score) else np.arange(len(score))
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [{**self.rows[i], "match": round(float(score[i]), 2)} for i in top], n_match
+
+
+# ---------------------------------------------------------------------
+# Process-wide matrix, rebuilt when the data version moves
+# ---------------------------------------------------------------------
+_lock = threading.Lock()
+_matrix: Optional[ScoreMatrix] = None
+_matrix_version: Optional[int] = None
+
+
+def get_matrix() -> ScoreMatrix:
+    """Shared ScoreMatrix for the current data version (built on first use)."""
+    global _matrix, _matrix_version
+    version = data_version()
+    if _matrix is not None and _matrix_version == version:
+        return _matrix
+    with _lock:
+        if _matrix is None or _matrix_version != version:
+            _matrix = ScoreMatrix(score_rows())
+            _matrix_version = version
+        return _matrix
+
+
+def rank(
+    weights: Mapping[str, float],
+    minimums: Optional[Mapping[str, float]] = None,
+    *,
+    k: int = 20,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """ScoreMatrix.rank() on the shared matrix."""
+    with metrics.timer("recommend_seconds"):
+        return get_matrix().rank(weights, minimums, k=k)
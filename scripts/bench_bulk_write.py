@@ -0,0 +1,100 @@
+"""
+scripts/bench_bulk_write.py
+---------------------------
+Compares db_handler's bulk write paths on synthetic rows:
+
+    execute_many  – execute_batch INSERT … ON CONFLICT (the old path)
+    copy_rows     – plain COPY FROM STDIN into an empty table
+    bulk_upsert   – COPY into staging + INSERT … ON CONFLICT
+
+Point DATABASE_URL at a throw-away local Postgres – the script creates and
+drops its own table (bench_bulk), it never touches tree_data.
+
+Run:
+    DATABASE_URL=postgresql://localhost/bench python -m scripts.bench_bulk_write
+    … --rows 10000 --rows 100000 --chunk-size 20000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from db_handler import bulk_upsert, copy_rows, execute_many, execute_query
+
+TABLE = "bench_bulk"
+COLUMNS = ("id", "tree_name", "score", "information")
+
+parser = argparse.ArgumentParser(description="Benchmark bulk write helpers")
+parser.add_argument("--rows", type=int, action="append", help="row counts (default 10k and 100k)")
+parser.add_argument("--chunk-size", type=int, default=None, help="COPY chunk size")
+args = parser.parse_args()
+
+sizes = args.rows or [10_000, 100_000]
+chunk = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+
+
+def make_rows(n: int, seed: int = 0) -> list[tuple]:
+    rnd = random.Random(seed)
+    word = lambda k: "".join(rnd.choices(string.ascii_lowercase, k=k))
+    return [
+        (i, f"{word(6).title()} {word(5).title()}", round(rnd.uniform(0, 10), 2), word(200))
+        for i in range(n)
+    ]
+
+
+def reset_table() -> None:
+    execute_query(
+        f"""
+        DROP TABLE IF EXISTS {TABLE};
+        CREATE TABLE {TABLE} (
+            id          integer PRIMARY KEY,
+            tree_name   text    NOT NULL,
+            score       numeric,
+            information text
+        );
+        """
+    )
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+upsert_sql = f"""
+INSERT INTO {TABLE} ({", ".join(COLUMNS)})
+VALUES (%s, %s, %s, %s)
+ON CONFLICT (id) DO UPDATE
+SET tree_name = EXCLUDED.tree_name, score = EXCLUDED.score,
+    information = EXCLUDED.information;
+"""
+
+print(f"{'rows':>8} {'method':<14} {'seconds':>9} {'rows/s':>10}")
+try:
+    for n in sizes:
+        rows = make_rows(n)
+        results = {}
+
+        reset_table()
+        results["execute_many"] = timed(lambda: execute_many(upsert_sql, rows))
+
+        reset_table()
+        results["copy_rows"] = timed(lambda: copy_rows(TABLE, rows, COLUMNS, **chunk))
+
+        reset_table()
+        results["bulk_upsert"] = timed(
+            lambda: bulk_upsert(TABLE, rows, COLUMNS, key=("id",), **chunk)
+        )
+
+        for method, secs in results.items():
+            print(f"{n:>8} {method:<14} {secs:>9.2f} {n / secs:>10,.0f}")
+        base = results["execute_many"]
+        print(
+            f"{'':>8} speed-up vs execute_many: "
+            f"copy_rows ×{base / results['copy_rows']:.1f}, "
+            f"bulk_upsert ×{base / results['bulk_upsert']:.1f}"
+        )
+finally:
+    execute_query(f"DROP TABLE IF EXISTS {TABLE};")
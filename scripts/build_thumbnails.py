@@ -0,0 +1,55 @@
+"""
+scripts/build_thumbnails.py
+---------------------------
+Pre-builds, with every CPU core, the WebP thumbnails the catalog grid
+static-serves from ./static/thumbnails and the JPEG/PNG ones that
+image_utils.show_tree_image() hands to st.image(). Thumbnails are keyed by
+the source file's content hash, so re-running only builds what is new or
+changed.
+
+Run:
+    python -m scripts.build_thumbnails
+    python -m scripts.build_thumbnails --width 140 --width 240 --display-width 240 --workers 4
+    python -m scripts.build_thumbnails --prune     # also drop stale files
+"""
+
+import argparse
+import time
+
+import thumbnails
+
+parser = argparse.ArgumentParser(description="Build cached tree thumbnails")
+parser.add_argument(
+    "--width",
+    type=int,
+    action="append",
+    help=f"static (catalog) width to build (repeatable, default {thumbnails.DEFAULT_WIDTHS})",
+)
+parser.add_argument(
+    "--display-width",
+    type=int,
+    action="append",
+    help=f"st.image width to build (repeatable, default {thumbnails.DISPLAY_WIDTHS})",
+)
+parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+parser.add_argument("--prune", action="store_true", help="delete thumbnails of changed/removed images")
+args = parser.parse_args()
+
+widths = tuple(args.width) if args.width else thumbnails.DEFAULT_WIDTHS
+display_widths = (
+    tuple(args.display_width) if args.display_width else thumbnails.DISPLAY_WIDTHS
+)
+
+print(f"🖼️  Building thumbnails {widths} + display {display_widths} into {thumbnails.THUMB_DIR} …")
+t0 = time.perf_counter()
+counts = thumbnails.build_all(
+    widths=widths, display_widths=display_widths, workers=args.workers
+)
+elapsed = time.perf_counter() - t0
+print(
+    f"✅  {counts['built']} built, {counts['cached']} already cached, "
+    f"{counts['failed']} failed in {elapsed:.1f}s."
+)
+
+if args.prune:
+    print(f"🧹  Removed {thumbnails.prune()} stale thumbnails.")
@@ -0,0 +1,35 @@
+"""
+scripts/export_snapshot.py
+--------------------------
+Exports tree_data to a local, read-only snapshot the app can serve from
+when Postgres is unavailable (TREE_DATA_BACKEND=snapshot, see snapshot.py).
+
+The output format follows the file extension: SQLite by default, Parquet
+for *.parquet (needs pyarrow). Re-run after every sync; a running app
+picks up the new file on its own.
+
+Run:
+    python -m scripts.export_snapshot
+    python -m scripts.export_snapshot --output data/tree_snapshot.parquet
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import snapshot
+
+parser = argparse.ArgumentParser(description="Export tree_data to an offline snapshot")
+parser.add_argument(
+    "-o", "--output",
+    type=Path,
+    default=snapshot.SNAPSHOT_PATH,
+    help=f"SQLite or .parquet file (default {snapshot.SNAPSHOT_PATH})",
+)
+args = parser.parse_args()
+
+print(f"📦  Exporting tree_data to {args.output} …")
+t0 = time.perf_counter()
+n = snapshot.export(args.output)
+size_kb = args.output.stat().st_size / 1024
+print(f"✅  {n} rows written ({size_kb:,.0f} KiB) in {time.perf_counter() - t0:.1f}s.")
@@ -16,13 +16,42 @@ Rules
    Columns: tree_name,scientific_name,image_file
    (scientific_name is optional but helps when two trees share a name.)
 
+3. Only files that really are images count: Git-LFS pointers and files
+   PIL cannot decode are reported and never linked. Photos with the same
+   perceptual hash are reported as likely duplicates.
+
+Incremental: file facts live in a manifest (image_manifest.py), so only new
+or changed files are opened – in parallel. When neither the images nor
+tree_data changed since the last run against the same database (host,
+port, dbname and schema are part of the saved state), the table isn't
+read at all.
+
 Run:
     python -m scripts.fill_image_paths
+    python -m scripts.fill_image_paths --full      # ignore the manifest
 """
 
-from pathlib import Path
+import argparse
 import csv
-from db_handler import execute_query, execute_many
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import image_manifest
+from db_handler import (
+    bulk_update,
+    bump_data_version,
+    get_connection,
+    get_data_version,
+    iter_query,
+    refresh_listing,
+)
+
+parser = argparse.ArgumentParser(description="Link tree_data rows to image files")
+parser.add_argument("--full", action="store_true", help="re-inspect every file and re-match every row")
+parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+args = parser.parse_args()
 
 # ------------------------------------------------------------------ #
 # Paths
@@ -30,6 +59,7 @@ from db_handler import execute_query, execute_many
 REPO_ROOT = Path(__file__).resolve().parent.parent
 IMG_DIR   = REPO_ROOT / "assets" / "tree_images"
 MAP_CSV   = REPO_ROOT / "assets" / "image_map.csv"  # optional
+SHOW_FILES = 10
 
 # ------------------------------------------------------------------ #
 # Helpers
@@ -51,53 +81,98 @@ def relative_posix(path: Path) -> str:
     return path.relative_to(REPO_ROOT).as_posix()
 
 
+def show(title: str, items: list[str]) -> None:
+    more = f" (+{len(items) - SHOW_FILES} more)" if len(items) > SHOW_FILES else ""
+    print(f"⚠️   {title}: {', '.join(items[:SHOW_FILES])}{more}")
+
+
+# ------------------------------------------------------------------ #
+# 1) Manifest: inspect new / changed files only
 # ------------------------------------------------------------------ #
-# 1) Build lookup: key -> image path
+t0 = time.perf_counter()
+manifest = {"files": {}, "state": {}} if args.full else image_manifest.load()
+counts = image_manifest.scan(manifest, IMG_DIR, workers=args.workers)
+files = manifest["files"]
+print(
+    f"🖼️  {len(files)} image files: {counts['inspected']} inspected, "
+    f"{counts['unchanged']} unchanged, {counts['removed']} removed "
+    f"({time.perf_counter() - t0:.1f}s)."
+)
+
+bad = sorted(f"{rel} [{e['error']}]" for rel, e in files.items() if not e["ok"])
+if bad:
+    show(f"{len(bad)} unusable files skipped", bad)
+for group in image_manifest.duplicates(manifest):
+    show("Likely duplicate photos", group)
+
+# ------------------------------------------------------------------ #
+# 2) Build lookup: key -> image path
 # key is slugified tree name (lowercase, underscores)
 # ------------------------------------------------------------------ #
 lookup: dict[str, str] = {}
 
-for img in IMG_DIR.glob("*"):
-    if img.suffix.lower() not in {".png", ".jpg", ".jpeg"}:
-        continue
-    key = slugify(img.stem)
-    lookup[key] = relative_posix(img)
+for rel, entry in files.items():
+    if entry["ok"]:
+        lookup[slugify(Path(rel).stem)] = rel
 
 # Optional explicit mappings
 if MAP_CSV.exists():
     with MAP_CSV.open(newline="", encoding="utf-8") as fh:
         reader = csv.DictReader(fh)
         for row in reader:
-            k = slugify(row["tree_name"])
-            lookup[k] = relative_posix(IMG_DIR / row["image_file"])
+            rel = relative_posix(IMG_DIR / row["image_file"])
+            if rel in files and not files[rel]["ok"]:
+                continue                              # reported above
+            lookup[slugify(row["tree_name"])] = rel
+
+def database_identity() -> str:
+    """host:port/dbname/schema we're writing to – a saved state only holds for it."""
+    with get_connection() as conn:
+        params = conn.info.dsn_parameters
+        with conn.cursor() as cur:
+            cur.execute("SELECT current_database() AS db, current_schema() AS schema;")
+            row = cur.fetchone()
+    return f"{params.get('host')}:{params.get('port', '5432')}/{row['db']}/{row['schema']}"
+
+
+# Nothing to do when neither the usable images nor the table moved.
+state = {
+    "database": database_identity(),
+    "lookup": hashlib.sha256(json.dumps(lookup, sort_keys=True).encode()).hexdigest()[:20],
+    "data_version": get_data_version(max_age=0),
+}
+if manifest.get("state") == state:
+    image_manifest.save(manifest)
+    print("✅  Images and tree_data unchanged since the last run – nothing to do.")
+    raise SystemExit(0)
 
 # ------------------------------------------------------------------ #
-# 2) Fetch tree rows + prepare updates
+# 3) Fetch tree rows + prepare updates
 # ------------------------------------------------------------------ #
-rows = execute_query(
-    "SELECT id, tree_name, image_path FROM tree_data;", fetch=True
-)
+# streamed through a server-side cursor – memory stays flat
+rows = iter_query("SELECT id, tree_name, image_path FROM tree_data;", as_tuples=True)
 
-updates: list[tuple[str, int]] = []
+updates: list[tuple[int, str]] = []
 matched, missing = 0, 0
 
-for r in rows:
-    key = slugify(r["tree_name"])
+for tree_id, tree_name, image_path in rows:
+    key = slugify(tree_name)
     if key in lookup:
         new_path = lookup[key]
-        if r["image_path"] != new_path:              # update only if changed
-            updates.append((new_path, r["id"]))
+        if image_path != new_path:                   # update only if changed
+            updates.append((tree_id, new_path))
         matched += 1
     else:
         missing += 1
 
 # ------------------------------------------------------------------ #
-# 3) Bulk update
+# 4) COPY the changed rows to a staging table, one UPDATE … FROM
 # ------------------------------------------------------------------ #
 if updates:
-    execute_many(
-        "UPDATE tree_data SET image_path = %s WHERE id = %s;",
-        updates,
-    )
+    bulk_update("tree_data", updates, ("id", "image_path"), key=("id",))
+    refresh_listing()                # tree_listing carries image_path too
+    state["data_version"] = bump_data_version()   # app servers drop cached results
 
+manifest["state"] = state
+image_manifest.save(manifest)
 print(f"✅  {matched} rows matched; {len(updates)} updated; {missing} with no image.")
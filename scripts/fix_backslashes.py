@@ -1,4 +1,4 @@
-from db_handler import execute_query
+from db_handler import bump_data_version, execute_query, refresh_listing
 
 sql = """
 UPDATE tree_data
@@ -6,4 +6,6 @@ SET    image_path = REPLACE(image_path, '\\', '/')
 WHERE  image_path LIKE '%\\%';
 """
 execute_query(sql)
+refresh_listing()
+bump_data_version()
 print("✅ Backslashes fixed.")
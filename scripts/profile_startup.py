@@ -0,0 +1,98 @@
+"""
+scripts/profile_startup.py
+--------------------------
+Cold-start profile of every page: each page runs in a FRESH interpreter
+(`python -X importtime` + Streamlit's AppTest), so the numbers match what
+the first visitor after a deploy waits for:
+
+    imports       – total import time, with the slowest top-level modules
+    first render  – first full script run (imports + queries + rendering)
+    warm rerun    – second run in the same process (caches warm)
+
+Run:
+    python -m scripts.profile_startup
+    python -m scripts.profile_startup --page pages/tree_search.py --top 15
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PAGES = ["app.py", *sorted(p.relative_to(REPO_ROOT).as_posix()
+                                   for p in (REPO_ROOT / "pages").glob("*.py"))]
+
+parser = argparse.ArgumentParser(description="Profile import and first-render time per page")
+parser.add_argument("--page", action="append", help="page script (repeatable, default: all)")
+parser.add_argument("--top", type=int, default=8, help="slowest imports to list per page")
+parser.add_argument("--timeout", type=float, default=120, help="render timeout per page (s)")
+args = parser.parse_args()
+
+# Runs inside the child interpreter. The page is executed by AppTest in the
+# same process, so -X importtime sees every import the page triggers.
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "streamlit_s": t1 - t0,
+    "first_render_s": t2 - t1,
+    "rerun_s": t3 - t2,
+    "errors": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, float]]:
+    """Top-level modules and their cumulative import time (ms)."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):               # nested imports are indented
+            out.append((name.strip(), int(cumulative_us) / 1000))
+    return out
+
+
+def profile(page: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD,
+         str(REPO_ROOT / page), str(args.timeout)],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        return {"page": page, "failed": tail[0]}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    result.update(
+        page=page,
+        imports_ms=sum(ms for _, ms in imports),
+        slowest=sorted(imports, key=lambda x: -x[1])[: args.top],
+    )
+    return result
+
+
+print(f"⏱️  Cold-start profile ({sys.executable})")
+for page in args.page or DEFAULT_PAGES:
+    r = profile(page)
+    print(f"\n▶  {page}")
+    if "failed" in r:
+        print(f"   ❌  {r['failed']}")
+        continue
+    print(f"   imports      {r['imports_ms']:>8.0f} ms")
+    for name, ms in r["slowest"]:
+        print(f"      {name:<28} {ms:>8.0f} ms")
+    print(f"   first render {r['first_render_s'] * 1000:>8.0f} ms")
+    print(f"   warm rerun   {r['rerun_s'] * 1000:>8.0f} ms")
+    for err in r["errors"]:
+        print(f"   ⚠️  {err}")
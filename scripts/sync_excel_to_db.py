@@ -1,59 +1,257 @@
 """
 scripts/sync_excel_to_db.py
 ---------------------------
-Reads data/tree_data.xlsx and upserts each row into Neon.
+Reads data/tree_data.xlsx and syncs it into Neon – incrementally.
+
+1. The sheet is streamed row by row (sheet_ingest.py – .xlsx, .csv or
+   .parquet), names are trimmed and scores validated, and the rows are
+   COPY-loaded in fixed-size batches into a temp staging table typed like
+   tree_data. Memory stays flat however big the sheet is.
+2. Each staged row is hashed (md5 of the whole row) and compared with the
+   hash of the live row with the same (tree_name, scientific_name).
+3. Only new rows are inserted, only changed rows are updated and – with
+   --delete – rows that left the sheet are removed, all in ONE transaction.
+
 Usage:
-    python scripts/sync_excel_to_db.py
+    python scripts/sync_excel_to_db.py               # apply
+    python scripts/sync_excel_to_db.py --dry-run     # report the diff only
+    python scripts/sync_excel_to_db.py --delete      # also drop removed rows
+    python scripts/sync_excel_to_db.py --path partner_trees.csv --strict
 """
 
+import argparse
+import sys
 from pathlib import Path
-import pandas as pd
-from db_handler import execute_many, execute_query
+
+from psycopg2 import sql
+
+from db_handler import (
+    bump_data_version,
+    copy_rows,
+    execute_query,
+    get_connection,
+    refresh_listing,
+)
+from sheet_ingest import SheetError, SheetReader
+from tree_queries import SCORE_LABELS
 
 EXCEL_PATH = Path(__file__).resolve().parent.parent / "data/tree_data.xlsx"
+KEY_COLS = ("tree_name", "scientific_name")
+SCORE_COLS = [c for c in SCORE_LABELS if c != "total_score"]   # 0–10 each
+SHOW_NAMES = 10                      # names listed per change type
+SHOW_ERRORS = 20                     # invalid sheet rows listed
+
+parser = argparse.ArgumentParser(description="Sync the tree spreadsheet into tree_data")
+parser.add_argument("--path", type=Path, default=EXCEL_PATH,
+                    help="sheet to load (.xlsx, .csv or .parquet)")
+parser.add_argument("--dry-run", action="store_true", help="show the diff, change nothing")
+parser.add_argument("--delete", action="store_true", help="delete rows missing from the sheet")
+parser.add_argument("--batch-size", type=int, default=5000,
+                    help="rows validated and sent to the database per batch")
+parser.add_argument("--strict", action="store_true",
+                    help="abort instead of skipping invalid rows")
+args = parser.parse_args()
 
 # Ensure UNIQUE constraint so duplicates can’t appear
-execute_query(
+if not args.dry_run:
+    execute_query(
+        """
+        DO $$
+        BEGIN
+          IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conname = 'tree_unique_name_scientific'
+          ) THEN
+            ALTER TABLE tree_data
+            ADD CONSTRAINT tree_unique_name_scientific
+              UNIQUE (tree_name, scientific_name);
+          END IF;
+        END $$;
+        """
+    )
+
+table_columns = {
+    r["column_name"]: r["data_type"]
+    for r in execute_query(
+        """
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_name = 'tree_data' AND table_schema = ANY(current_schemas(false));
+        """,
+        fetch=True,
+    )
+}
+try:
+    reader = SheetReader(args.path, table_columns, score_columns=SCORE_COLS)
+except SheetError as e:
+    sys.exit(f"❌  {args.path.name}: {e}")
+cols = reader.columns
+
+
+def report_invalid() -> None:
+    for row_no, msg in reader.errors[:SHOW_ERRORS]:
+        print(f"   row {row_no}: {msg}")
+    if reader.error_count > SHOW_ERRORS:
+        print(f"   … {reader.error_count - SHOW_ERRORS} more")
+
+
+# ------------------------------------------------------------------ #
+# SQL fragments
+# ------------------------------------------------------------------ #
+col_ids = sql.SQL(", ").join(map(sql.Identifier, cols))
+
+
+def row_hash(alias: str) -> sql.Composable:
+    """md5 of the row's text form – identical types on both sides."""
+    return sql.SQL("md5(ROW({})::text)").format(
+        sql.SQL(", ").join(sql.Identifier(alias, c) for c in cols)
+    )
+
+
+# Blank scientific names are NULL; match those too (tree_name stays a
+# plain equality so the join can still hash on it).
+key_match = sql.SQL(
+    "t.tree_name = s.tree_name AND t.scientific_name IS NOT DISTINCT FROM s.scientific_name"
+)
+changed = sql.SQL("{} <> {}").format(row_hash("s"), row_hash("t"))
+
+# _seq records sheet order so the dedupe below can keep the last row.
+stage_sql = sql.SQL(
+    "CREATE TEMP TABLE tree_stage ON COMMIT DROP AS "
+    "SELECT {cols} FROM tree_data WITH NO DATA; "
+    "ALTER TABLE tree_stage ADD COLUMN _seq bigserial;"
+).format(cols=col_ids)
+
+# Last occurrence of a (tree_name, scientific_name) pair wins, as it did
+# with the old row-by-row upsert.
+dedupe_sql = sql.SQL(
     """
-    DO $$
-    BEGIN
-      IF NOT EXISTS (
-        SELECT 1 FROM pg_constraint
-        WHERE conname = 'tree_unique_name_scientific'
-      ) THEN
-        ALTER TABLE tree_data
-        ADD CONSTRAINT tree_unique_name_scientific
-          UNIQUE (tree_name, scientific_name);
-      END IF;
-    END $$;
+    DELETE FROM tree_stage s
+    USING (
+        SELECT _seq, row_number() OVER (
+                   PARTITION BY tree_name, scientific_name ORDER BY _seq DESC) AS pos
+        FROM tree_stage
+    ) d
+    WHERE s._seq = d._seq AND d.pos > 1;
     """
 )
 
-df = pd.read_excel(EXCEL_PATH)
-
-# Trim whitespace
-df["tree_name"] = df["tree_name"].astype(str).str.strip()
-df["scientific_name"] = df["scientific_name"].astype(str).str.strip()
+# Earlier syncs stored blank scientific names as the string 'nan' (pandas);
+# they're NULL now, so convert old rows before comparing or they'd be
+# inserted again as new trees.
+migrate_nan_sql = "UPDATE tree_data SET scientific_name = NULL WHERE scientific_name = 'nan';"
 
-cols = list(df.columns)
-placeholders = ", ".join(["%s"] * len(cols))
-col_list = ", ".join(cols)
+# Counts plus the first few names per action (a top-N sort, not every
+# name) – the full diff never leaves the server.
+diff_sql = sql.SQL(
+    """
+    WITH d AS MATERIALIZED (
+        SELECT s.tree_name,
+               CASE WHEN t.tree_name IS NULL THEN 'insert'
+                    WHEN {changed}            THEN 'update'
+                    ELSE 'same' END AS action
+        FROM tree_stage s
+        LEFT JOIN tree_data t ON {key_match}
+        UNION ALL
+        SELECT t.tree_name, 'delete'
+        FROM tree_data t
+        WHERE NOT EXISTS (SELECT 1 FROM tree_stage s WHERE {key_match})
+    )
+    SELECT c.action, c.n,
+           ARRAY(SELECT d.tree_name FROM d WHERE d.action = c.action
+                 ORDER BY d.tree_name LIMIT {show}) AS names
+    FROM (SELECT action, count(*) AS n FROM d GROUP BY action) c;
+    """
+).format(changed=changed, key_match=key_match, show=sql.Literal(SHOW_NAMES))
 
-update_sets = ", ".join(
-    f"{c}=EXCLUDED.{c}"
-    for c in cols
-    if c not in ("tree_name", "scientific_name")
+update_sql = sql.SQL(
+    "UPDATE tree_data t SET {sets} FROM tree_stage s WHERE {key_match} AND {changed};"
+).format(
+    sets=sql.SQL(", ").join(
+        sql.SQL("{0} = s.{0}").format(sql.Identifier(c)) for c in cols if c not in KEY_COLS
+    ),
+    key_match=key_match,
+    changed=changed,
 )
 
-sql = f"""
-INSERT INTO tree_data ({col_list})
-VALUES ({placeholders})
-ON CONFLICT (tree_name, scientific_name)
-DO UPDATE SET {update_sets};
-"""
+insert_sql = sql.SQL(
+    "INSERT INTO tree_data ({cols}) SELECT {cols} FROM tree_stage s "
+    "WHERE NOT EXISTS (SELECT 1 FROM tree_data t WHERE {key_match});"
+).format(cols=col_ids, key_match=key_match)
 
-data_tuples = [tuple(r) for r in df.itertuples(index=False, name=None)]
+delete_sql = sql.SQL(
+    "DELETE FROM tree_data t WHERE NOT EXISTS (SELECT 1 FROM tree_stage s WHERE {key_match});"
+).format(key_match=key_match)
+
+# ------------------------------------------------------------------ #
+# Stage, diff, apply – one transaction
+# ------------------------------------------------------------------ #
+print(f"⏫  Streaming {args.path.name} into staging (batches of {args.batch_size}) …")
+with get_connection() as conn:
+    with conn.cursor() as cur:
+        cur.execute(stage_sql)
+        copy_rows(
+            "tree_stage", reader.rows(args.batch_size), cols,
+            chunk_size=args.batch_size, conn=conn,
+        )
+        if reader.error_count:
+            print(f"⚠️   {reader.error_count} invalid sheet row(s) skipped:")
+            report_invalid()
+            if args.strict:
+                conn.rollback()
+                sys.exit("❌  Aborted (--strict): fix the sheet and re-run.")
+
+        cur.execute(dedupe_sql)
+        duplicates = cur.rowcount
+        cur.execute("ANALYZE tree_stage;")       # temp tables get no autovacuum stats
+        cur.execute(migrate_nan_sql)
+        migrated = cur.rowcount
+        if migrated:
+            print(f"   {migrated} old 'nan' scientific names set to NULL")
+
+        cur.execute(diff_sql)
+        counts = {"insert": 0, "update": 0, "delete": 0, "same": 0}
+        samples: dict[str, list[str]] = {}
+        for r in cur.fetchall():
+            counts[r["action"]] = r["n"]
+            samples[r["action"]] = r["names"]
+        kept = 0 if args.delete else counts["delete"]
+        if not args.delete:
+            counts["delete"] = 0
+
+        for action in ("insert", "update", "delete"):
+            n = counts[action]
+            if n:
+                more = f" (+{n - SHOW_NAMES} more)" if n > SHOW_NAMES else ""
+                print(f"   {action:>6}: {', '.join(samples[action])}{more}")
+
+        n_changes = counts["insert"] + counts["update"] + counts["delete"] + migrated
+        if args.dry_run or not n_changes:
+            conn.rollback()
+        else:
+            cur.execute(update_sql)
+            cur.execute(insert_sql)
+            if args.delete:
+                cur.execute(delete_sql)
+            conn.commit()
+
+summary = (
+    f"{counts['insert']} inserted, {counts['update']} updated, "
+    f"{counts['delete']} deleted, {counts['same']} unchanged"
+)
+if duplicates:
+    summary += f" ({duplicates} duplicate sheet rows ignored)"
+if reader.error_count:
+    summary += f" ({reader.error_count} invalid rows skipped)"
+if migrated:
+    summary += f" ({migrated} 'nan' scientific names set to NULL)"
+if kept:
+    print(f"ℹ️   {kept} DB rows are not in the sheet (use --delete to remove them).")
 
-print(f"⏫  Syncing {len(data_tuples)} rows from Excel to Neon …")
-execute_many(sql, data_tuples)
-print("✅  Done! Excel and database are now in sync.")
+if args.dry_run:
+    print(f"🔎  Dry run – would apply: {summary}.")
+elif n_changes:
+    refresh_listing()                # tree_listing view (no-op until created)
+    bump_data_version()              # app servers drop cached results
+    print(f"✅  Done! {summary}.")
+else:
+    print(f"✅  Already in sync ({summary}).")
@@ -0,0 +1,215 @@
+# sheet_ingest.py
+"""
+Streaming reader for the tree spreadsheet (used by scripts/sync_excel_to_db.py).
+
+The sheet is never loaded as a whole: rows are read one at a time
+(.xlsx through openpyxl's read-only mode, .csv through the csv module,
+.parquet batch by batch through pyarrow), cleaned and validated in chunks
+of *chunk_size*, and handed on as fixed-size batches. Memory stays flat
+however large a partner-supplied sheet is.
+
+    reader = SheetReader(path, table_columns)
+    for batch in reader.batches(chunk_size=5000):
+        ...                               # list of tuples in reader.columns order
+    reader.errors                         # rows skipped, with the reason
+"""
+
+import csv
+import math
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+NAME_COLUMNS = ("tree_name", "scientific_name")
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+NUMBER_TYPES = {"numeric", "real", "double precision"}
+SCORE_RANGE = (0, 10)                # per-criterion scores; totals are unbounded
+MAX_ERRORS_KEPT = 1000
+
+
+class SheetError(ValueError):
+    """The sheet can't be synced at all (unknown format, bad header, …)."""
+
+
+# ---------------------------------------------------------------------
+# Raw rows per format
+# ---------------------------------------------------------------------
+def _xlsx_rows(path: Path) -> Iterator[Sequence[Any]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()                    # read-only workbooks keep the file open
+
+
+def _csv_rows(path: Path) -> Iterator[Sequence[Any]]:
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        yield from csv.reader(fh)
+
+
+def _parquet_rows(path: Path, batch_size: int = 10_000) -> Iterator[Sequence[Any]]:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    yield pf.schema_arrow.names
+    for batch in pf.iter_batches(batch_size=batch_size):
+        yield from zip(*(col.to_pylist() for col in batch.columns))
+
+
+READERS = {
+    ".xlsx": _xlsx_rows,
+    ".xlsm": _xlsx_rows,
+    ".csv": _csv_rows,
+    ".parquet": _parquet_rows,
+}
+
+# ---------------------------------------------------------------------
+# Cleaning / validation
+# ---------------------------------------------------------------------
+def _blank(v: Any) -> bool:
+    return v is None or (isinstance(v, float) and math.isnan(v)) or (
+        isinstance(v, str) and not v.strip()
+    )
+
+
+def clean_name(v: Any) -> Optional[str]:
+    """'  Brant’s   Oak ' -> 'Brant’s Oak'; blanks become None."""
+    if _blank(v):
+        return None
+    return " ".join(str(v).split())
+
+
+def to_int(v: Any) -> Optional[int]:
+    """7, 7.0, '7', ' 7.0 ' -> 7; blanks -> None; anything else raises ValueError."""
+    if _blank(v):
+        return None
+    if isinstance(v, bool):
+        raise ValueError(v)
+    if isinstance(v, int):
+        return v
+    f = float(str(v).strip()) if not isinstance(v, float) else v
+    if not f.is_integer():
+        raise ValueError(v)
+    return int(f)
+
+
+def to_number(v: Any) -> Optional[int | float]:
+    """7, '7', ' 7.0 ' -> 7; '7.5' -> 7.5; blanks -> None; anything else raises ValueError."""
+    if _blank(v):
+        return None
+    if isinstance(v, bool):
+        raise ValueError(v)
+    f = float(str(v).strip()) if not isinstance(v, (int, float)) else float(v)
+    if not math.isfinite(f):
+        raise ValueError(v)
+    return int(f) if f.is_integer() else f
+
+
+class SheetReader:
+    """
+    Streams the rows of *path* that match *table_columns* ({name: pg data
+    type}). Header columns must all exist in the table; the name columns
+    are required. Integer and other numeric columns are parsed, and
+    *score_columns* are parsed and range-checked whatever their type.
+    Invalid rows are skipped and recorded in .errors as (sheet row number,
+    message); .rows_read counts data rows seen.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        table_columns: Dict[str, str],
+        *,
+        score_columns: Sequence[str] = (),
+    ):
+        self.path = Path(path)
+        reader = READERS.get(self.path.suffix.lower())
+        if reader is None:
+            raise SheetError(
+                f"unsupported file type {self.path.suffix!r} "
+                f"(use one of {', '.join(sorted(READERS))})"
+            )
+        self._raw = reader(self.path)
+        header = next(self._raw, None)
+        if header is None:
+            raise SheetError(f"{self.path.name} is empty")
+
+        # Trailing empty header cells are common in hand-edited sheets.
+        names = [clean_name(h) for h in header]
+        while names and names[-1] is None:
+            names.pop()
+        unknown = [n for n in names if n not in table_columns]
+        if unknown:
+            raise SheetError(f"columns not in tree_data: {', '.join(map(str, unknown))}")
+        missing = [c for c in NAME_COLUMNS if c not in names]
+        if missing:
+            raise SheetError(f"required columns missing: {', '.join(missing)}")
+
+        self.columns: List[str] = names
+        self._width = len(names)
+        self._score_cols = {names.index(c) for c in score_columns if c in names}
+        # (column index, parser) for every column that must hold a number
+        self._parsers = [
+            (i, to_int if table_columns[c] in INTEGER_TYPES else to_number)
+            for i, c in enumerate(names)
+            if c != "id" and (
+                table_columns[c] in INTEGER_TYPES | NUMBER_TYPES or i in self._score_cols
+            )
+        ]
+        self._parsed = {i for i, _ in self._parsers}
+        self._name_cols = [names.index(c) for c in NAME_COLUMNS]
+        self.errors: List[Tuple[int, str]] = []
+        self.error_count = 0
+        self.rows_read = 0
+
+    def _error(self, row_no: int, msg: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append((row_no, msg))
+
+    def _clean_chunk(self, chunk: List[Tuple[int, Sequence[Any]]]) -> List[tuple]:
+        out = []
+        lo, hi = SCORE_RANGE
+        for row_no, raw in chunk:
+            row = list(raw[: self._width]) + [None] * (self._width - len(raw))
+            for i in self._name_cols:
+                row[i] = clean_name(row[i])
+            if row[self._name_cols[0]] is None:
+                self._error(row_no, "tree_name is empty")
+                continue
+            try:
+                for i, parse in self._parsers:
+                    try:
+                        row[i] = parse(row[i])
+                    except (TypeError, ValueError):
+                        kind = "a whole number" if parse is to_int else "a number"
+                        raise ValueError(f"{self.columns[i]}={raw[i]!r} is not {kind}")
+                    if i in self._score_cols and row[i] is not None and not lo <= row[i] <= hi:
+                        raise ValueError(f"{self.columns[i]}={row[i]} is outside {lo}–{hi}")
+            except ValueError as e:
+                self._error(row_no, str(e))
+                continue
+            for i, v in enumerate(row):
+                if i not in self._parsed and _blank(v):
+                    row[i] = None
+            out.append(tuple(row))
+        return out
+
+    def batches(self, chunk_size: int = 5000) -> Iterator[List[tuple]]:
+        """Clean, valid rows in batches of (up to) *chunk_size*."""
+        numbered = (
+            (n, r) for n, r in enumerate(self._raw, start=2)          # row 1 = header
+            if any(not _blank(v) for v in r)                           # skip empty rows
+        )
+        while chunk := list(islice(numbered, chunk_size)):
+            self.rows_read += len(chunk)
+            batch = self._clean_chunk(chunk)
+            if batch:
+                yield batch
+
+    def rows(self, chunk_size: int = 5000) -> Iterator[tuple]:
+        """Same rows as batches(), one at a time."""
+        for batch in self.batches(chunk_size):
+            yield from batch
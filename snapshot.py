@@ -0,0 +1,297 @@
+# snapshot.py
+"""
+Offline, read-only copy of tree_data so the app keeps serving when Neon is
+slow, cold or unreachable.
+
+• export(path)  – dump tree_data (+ the current data version) to a SQLite
+                  file, or to Parquet when *path* ends in .parquet
+• query(sql)    – read-only queries against the snapshot; accepts the same
+                  %s placeholders as db_handler and returns the same
+                  list[dict] rows
+
+The pages never call this directly: set TREE_DATA_BACKEND=snapshot and
+tree_queries answers every read from TREE_SNAPSHOT_PATH instead of Postgres.
+A re-exported file is picked up automatically (checked every
+SNAPSHOT_STAT_INTERVAL seconds).
+
+Export:
+    python -m scripts.export_snapshot                      # SQLite (default path)
+    python -m scripts.export_snapshot -o data/trees.parquet
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import metrics
+
+REPO_ROOT = Path(__file__).resolve().parent
+# Relative paths are taken from the repo root, so the app and the export
+# script agree on the file whatever directory they were started from.
+SNAPSHOT_PATH: Path = REPO_ROOT / os.getenv("TREE_SNAPSHOT_PATH", "data/tree_snapshot.sqlite")
+SNAPSHOT_STAT_INTERVAL: float = float(os.getenv("SNAPSHOT_STAT_INTERVAL", "5"))
+
+TABLE = "tree_data"
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+
+# psycopg2 returns numeric columns as Decimal, which sqlite3 can't bind;
+# they are stored as REAL anyway (see _sqlite_type).
+sqlite3.register_adapter(Decimal, float)
+
+# ---------------------------------------------------------------------
+# Export (needs Postgres)
+# ---------------------------------------------------------------------
+def _pg_columns() -> List[Dict[str, str]]:
+    from db_handler import execute_query
+
+    return execute_query(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = %s AND table_schema = ANY(current_schemas(false))
+        ORDER BY ordinal_position;
+        """,
+        (TABLE,),
+        fetch=True,
+    )
+
+
+def _sqlite_type(pg_type: str) -> str:
+    if pg_type in INTEGER_TYPES:
+        return "INTEGER"
+    if pg_type in ("real", "double precision", "numeric"):
+        return "REAL"
+    return "TEXT"
+
+
+def export(path: Path = SNAPSHOT_PATH) -> int:
+    """
+    Write tree_data to *path* (SQLite, or Parquet for *.parquet) and return
+    the row count. The file is written next to *path* and swapped in
+    atomically, so a running app never sees a half-written snapshot.
+    """
+    from db_handler import get_data_version, iter_query
+
+    path = Path(path)
+    columns = _pg_columns()
+    if not columns:
+        raise RuntimeError(f"table {TABLE} not found")
+    names = [c["column_name"] for c in columns]
+    version = get_data_version(max_age=0)
+    rows = iter_query(
+        f"SELECT {', '.join(names)} FROM {TABLE} ORDER BY id;", as_tuples=True
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        if path.suffix == ".parquet":
+            n = _write_parquet(tmp, columns, rows, version)
+        else:
+            n = _write_sqlite(tmp, columns, rows, version)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return n
+
+
+def _create_sqlite(conn: sqlite3.Connection, columns: Sequence[Dict[str, str]]) -> None:
+    defs = ", ".join(
+        f"{c['column_name']} {_sqlite_type(c['data_type'])}"
+        + (" PRIMARY KEY" if c["column_name"] == "id" else "")
+        for c in columns
+    )
+    conn.executescript(
+        f"""
+        CREATE TABLE {TABLE} ({defs});
+        CREATE INDEX {TABLE}_name_id ON {TABLE} (tree_name, id);
+        CREATE TABLE tree_listing (
+            id INTEGER PRIMARY KEY, tree_name TEXT, scientific_name TEXT, image_path TEXT
+        );
+        CREATE INDEX tree_listing_name_id ON tree_listing (tree_name, id);
+        CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT);
+        """
+    )
+
+
+def _fill_sqlite(
+    conn: sqlite3.Connection,
+    columns: Sequence[Dict[str, str]],
+    rows: Iterable[Sequence[Any]],
+    version: int,
+    exported_at: str,
+) -> int:
+    marks = ", ".join("?" * len(columns))
+    n = 0
+    cur = conn.cursor()
+    for row in rows:
+        cur.execute(f"INSERT INTO {TABLE} VALUES ({marks});", row)
+        n += 1
+    # Same content as the Postgres tree_listing view: one row per name.
+    conn.execute(
+        f"""
+        INSERT INTO tree_listing
+        SELECT id, tree_name, scientific_name, image_path FROM {TABLE}
+        WHERE id IN (SELECT min(id) FROM {TABLE} GROUP BY tree_name);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO snapshot_meta VALUES (?, ?);",
+        [("data_version", str(version)), ("exported_at", exported_at), ("rows", str(n))],
+    )
+    return n
+
+
+def _write_sqlite(tmp: Path, columns, rows, version: int) -> int:
+    conn = sqlite3.connect(tmp)
+    try:
+        _create_sqlite(conn, columns)
+        n = _fill_sqlite(conn, columns, rows, version, _now())
+        conn.commit()
+        conn.execute("VACUUM;")
+    finally:
+        conn.close()
+    return n
+
+
+def _write_parquet(tmp: Path, columns, rows, version: int) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet snapshots need pyarrow (pip install pyarrow)") from e
+
+    names = [c["column_name"] for c in columns]
+    data = list(zip(*rows)) or [()] * len(names)
+    types = [pa.int64() if c["data_type"] in INTEGER_TYPES else None for c in columns]
+    table = pa.table({n: pa.array(col, type=t) for n, col, t in zip(names, data, types)})
+    table = table.replace_schema_metadata({
+        "krg.data_version": str(version),
+        "krg.exported_at": _now(),
+        "krg.columns": ",".join(f"{c['column_name']}:{c['data_type']}" for c in columns),
+    })
+    pq.write_table(table, tmp)
+    return table.num_rows
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+# ---------------------------------------------------------------------
+# Read-only backend
+# ---------------------------------------------------------------------
+class Snapshot:
+    """
+    One opened snapshot. SQLite files are opened read-only; Parquet files
+    are loaded into an in-memory SQLite database so both formats answer
+    the same SQL. A single connection is shared behind a lock – local
+    reads are sub-millisecond, so serialising them costs nothing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        st = self.path.stat()
+        self.signature = (st.st_mtime_ns, st.st_size)
+        if self.path.suffix == ".parquet":
+            self.conn = self._load_parquet()
+        else:
+            self.conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+        self.conn.row_factory = _dict_row
+        self.lock = threading.Lock()
+        meta = dict(
+            (r["key"], r["value"]) for r in self._run("SELECT key, value FROM snapshot_meta;")
+        )
+        self.data_version = int(meta.get("data_version", 0))
+        self.exported_at: Optional[str] = meta.get("exported_at")
+
+    def _load_parquet(self) -> sqlite3.Connection:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.path)
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        columns = [
+            {"column_name": name, "data_type": typ}
+            for name, typ in (c.split(":", 1) for c in meta["krg.columns"].split(","))
+        ]
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        _create_sqlite(conn, columns)
+        names = [c["column_name"] for c in columns]
+        rows = zip(*(table.column(n).to_pylist() for n in names))
+        _fill_sqlite(
+            conn, columns, rows,
+            int(meta.get("krg.data_version", 0)), meta.get("krg.exported_at", ""),
+        )
+        conn.commit()
+        return conn
+
+    def _run(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _dict_row(cur: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    return {d[0]: v for d, v in zip(cur.description, row)}
+
+
+_PLACEHOLDER = re.compile(r"%(s|%)")
+
+
+def _to_qmark(sql: str) -> str:
+    """psycopg2 'format' placeholders → sqlite3 qmark ('%s' → '?', '%%' → '%')."""
+    return _PLACEHOLDER.sub(lambda m: "?" if m.group(1) == "s" else "%", sql)
+
+
+_current: Optional[Snapshot] = None
+_checked_at = 0.0
+_open_lock = threading.Lock()
+
+
+def get_snapshot() -> Snapshot:
+    """The snapshot at SNAPSHOT_PATH, reopened when the file was replaced."""
+    global _current, _checked_at
+    now = time.monotonic()
+    if _current is not None and now - _checked_at < SNAPSHOT_STAT_INTERVAL:
+        return _current
+    with _open_lock:
+        try:
+            st = SNAPSHOT_PATH.stat()
+        except FileNotFoundError:
+            if _current is not None:           # keep serving the last good copy
+                return _current
+            raise RuntimeError(
+                f"No snapshot at {SNAPSHOT_PATH} – run `python -m scripts.export_snapshot`"
+            ) from None
+        if _current is None or _current.signature != (st.st_mtime_ns, st.st_size):
+            _current = Snapshot(SNAPSHOT_PATH)   # old one is left to the GC
+        _checked_at = now
+        return _current
+
+
+def query(
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    *,
+    name: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Read-only query against the snapshot; rows shaped like execute_query(fetch=True)."""
+    t0 = time.perf_counter()
+    try:
+        return get_snapshot()._run(_to_qmark(sql), tuple(params or ()))
+    finally:
+        if metrics.ENABLED:
+            metrics.observe_query(f"snapshot:{name or 'unnamed'}", time.perf_counter() - t0, sql)
+
+
+def data_version() -> int:
+    """Data version recorded when the snapshot was exported."""
+    return get_snapshot().data_version
@@ -0,0 +1,252 @@
+# thumbnails.py
+"""
+Resized, recompressed copies of the tree images.
+
+st.image() used to receive full-size originals even though the pages show
+them 140–240 px wide. Here every (source, width) pair gets a variant in
+THUMB_DIR named after the source's content hash, so a thumbnail is rebuilt
+only when the source bytes change. Two kinds:
+
+• static  – WebP at THUMB_DENSITY× the width, fetched by the browser as a
+            static file (the catalog grid's <img srcset>)
+• display – JPEG (PNG if the image has alpha) at exactly the width, for
+            st.image(): Streamlit only sends JPEG/PNG/GIF and re-encodes
+            anything else or anything wider than the width on every call,
+            so these bytes are the ones it passes through untouched
+
+• thumbnail_path(src, width)         – static variant, built on demand
+• display_thumbnail_path(src, width) – display variant (used by image_utils)
+• static_url(thumb)                  – browser URL of a thumbnail under ./static
+• build_all(...)                     – parallel pre-build (scripts/build_thumbnails.py)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).parent
+IMG_DIR = REPO_ROOT / "assets" / "tree_images"
+# Inside ./static so Streamlit can serve thumbnails by URL (app/static/…).
+STATIC_DIR = REPO_ROOT / "static"
+THUMB_DIR = Path(os.getenv("THUMB_DIR", STATIC_DIR / "thumbnails"))
+
+THUMB_FORMAT = "WEBP"
+THUMB_SUFFIX = ".webp"
+THUMB_QUALITY = int(os.getenv("THUMB_QUALITY", "80"))
+# Render static thumbnails at 2× the CSS width so they stay sharp on HiDPI
+# screens (the browser scales them; st.image() would not).
+THUMB_DENSITY = int(os.getenv("THUMB_DENSITY", "2"))
+DISPLAY_QUALITY = int(os.getenv("THUMB_DISPLAY_QUALITY", "90"))   # JPEG, as st.image uses
+
+DETAIL_WIDTH = 240                   # Tree Search detail image (show_tree_image)
+DEFAULT_WIDTHS = (140, 240)          # static: catalog grid (catalog_grid.SRCSET_WIDTHS)
+DISPLAY_WIDTHS = (DETAIL_WIDTH,)     # display: st.image() sizes
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+
+# (path, mtime_ns, size) -> content hash; avoids re-hashing on every rerun
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+# (path, width, kind) -> (resolved_at, thumbnail); skips the stat() calls
+# for RESOLVE_INTERVAL seconds so hot thumbnails cost no filesystem I/O.
+RESOLVE_INTERVAL: float = float(os.getenv("THUMB_RESOLVE_INTERVAL", "10"))
+_resolved: Dict[Tuple[str, int, str], Tuple[float, Path]] = {}
+
+
+def content_hash(src: Path) -> str:
+    """Short SHA-256 of the file bytes (memoised on path + mtime + size)."""
+    st = src.stat()
+    key = (str(src), st.st_mtime_ns, st.st_size)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with src.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()[:20]
+    with _hash_lock:
+        _hash_cache[key] = digest
+    return digest
+
+
+def _target(digest: str, width: int) -> Path:
+    return THUMB_DIR / f"{digest}_{width}{THUMB_SUFFIX}"
+
+
+def _display_targets(digest: str, width: int) -> Tuple[Path, Path]:
+    """(JPEG, PNG) candidates – which one exists depends on the source's alpha."""
+    stem = THUMB_DIR / f"{digest}_{width}_1x"
+    return stem.with_suffix(".jpg"), stem.with_suffix(".png")
+
+
+def has_alpha(im) -> bool:
+    return im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info
+
+
+def for_st_image(im) -> Tuple[object, str]:
+    """(*im* converted, PIL format) that st.image() sends as-is: PNG with alpha, else JPEG."""
+    if has_alpha(im):
+        return (im if im.mode == "RGBA" else im.convert("RGBA")), "PNG"
+    return (im if im.mode == "RGB" else im.convert("RGB")), "JPEG"
+
+
+def _resized(im, px: int):
+    from PIL import Image
+
+    if im.width > px:
+        im = im.resize((px, max(1, round(im.height * px / im.width))), Image.LANCZOS)
+    return im
+
+
+def _save_atomic(im, dest: Path, fmt: str, **options) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        im.save(tmp, fmt, **options)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _render(src: Path, dest: Path, width: int) -> None:
+    """Resize *src* to *width*×density and write WebP atomically to *dest*."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        im = _resized(ImageOps.exif_transpose(im), width * THUMB_DENSITY)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if has_alpha(im) else "RGB")
+        _save_atomic(im, dest, THUMB_FORMAT, quality=THUMB_QUALITY, method=4)
+
+
+def _render_display(src: Path, digest: str, width: int) -> Path:
+    """Resize *src* to exactly *width* (never upscaled) as JPEG or PNG; returns the file."""
+    from PIL import Image, ImageOps
+
+    jpg, png = _display_targets(digest, width)
+    with Image.open(src) as im:
+        im, fmt = for_st_image(_resized(ImageOps.exif_transpose(im), width))
+        dest = png if fmt == "PNG" else jpg
+        if fmt == "PNG":
+            _save_atomic(im, dest, fmt, optimize=True)
+        else:
+            _save_atomic(im, dest, fmt, quality=DISPLAY_QUALITY, optimize=True)
+    return dest
+
+
+def _build(src: Path, width: int, kind: str) -> Path:
+    digest = content_hash(src)
+    if kind == "display":
+        existing = [p for p in _display_targets(digest, width) if p.exists()]
+        return existing[0] if existing else _render_display(src, digest, width)
+    dest = _target(digest, width)
+    if not dest.exists():
+        _render(src, dest, width)
+    return dest
+
+
+def _resolve(src: Path, width: int, kind: str) -> Optional[Path]:
+    key = (str(src), width, kind)
+    now = time.monotonic()
+    hit = _resolved.get(key)
+    if hit and now - hit[0] < RESOLVE_INTERVAL:
+        return hit[1]
+    try:
+        dest = _build(src, width, kind)
+    except (OSError, ValueError):            # PIL raises OSError subclasses
+        return None
+    _resolved[key] = (now, dest)
+    return dest
+
+
+def thumbnail_path(src: Path, width: int) -> Optional[Path]:
+    """
+    Path of the static (WebP, THUMB_DENSITY×) *width* thumbnail for *src*,
+    building it if missing. Returns None when *src* is missing or not a
+    decodable image (e.g. a Git-LFS pointer that has not been pulled yet).
+    """
+    return _resolve(src, width, "static")
+
+
+def display_thumbnail_path(src: Path, width: int) -> Optional[Path]:
+    """Like thumbnail_path(), but the JPEG/PNG at exactly *width* for st.image()."""
+    return _resolve(src, width, "display")
+
+
+def static_url(thumb: Path) -> Optional[str]:
+    """
+    Relative URL Streamlit serves *thumb* at (enableStaticServing), or None
+    if THUMB_DIR was moved outside ./static.
+    """
+    try:
+        rel = thumb.resolve().relative_to(STATIC_DIR.resolve())
+    except ValueError:
+        return None
+    return f"app/static/{rel.as_posix()}"
+
+
+def _build_one(job: Tuple[str, int, str]) -> Tuple[str, int, str]:
+    src, width, kind = job
+    dest = _resolve(Path(src), width, kind)
+    return src, width, "ok" if dest else "failed"
+
+
+def build_all(
+    sources: Optional[Iterable[Path]] = None,
+    widths: Iterable[int] = DEFAULT_WIDTHS,
+    *,
+    display_widths: Iterable[int] = DISPLAY_WIDTHS,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Build every missing static (*widths*) and display (*display_widths*)
+    thumbnail across all CPU cores.
+    Returns counts: {"built": n, "cached": n, "failed": n}.
+    """
+    if sources is None:
+        sources = sorted(p for p in IMG_DIR.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    counts = {"built": 0, "cached": 0, "failed": 0}
+    widths, display_widths = tuple(widths), tuple(display_widths)
+    jobs: List[Tuple[str, int, str]] = []
+    for src in sources:
+        try:
+            digest = content_hash(src)
+        except OSError:
+            counts["failed"] += 1
+            continue
+        for w in widths:
+            if _target(digest, w).exists():
+                counts["cached"] += 1
+            else:
+                jobs.append((str(src), w, "static"))
+        for w in display_widths:
+            if any(p.exists() for p in _display_targets(digest, w)):
+                counts["cached"] += 1
+            else:
+                jobs.append((str(src), w, "display"))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _, _, status in pool.map(_build_one, jobs, chunksize=4):
+                counts["built" if status == "ok" else "failed"] += 1
+    return counts
+
+
+def prune(sources: Optional[Iterable[Path]] = None) -> int:
+    """Delete thumbnails whose source no longer exists / has changed."""
+    if sources is None:
+        sources = (p for p in IMG_DIR.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    live = {content_hash(p) for p in sources}
+    removed = 0
+    if THUMB_DIR.exists():
+        for thumb in THUMB_DIR.glob("*_*.*"):           # static and display variants
+            if thumb.name.split("_", 1)[0] not in live:
+                thumb.unlink(missing_ok=True)
+                removed += 1
+    return removed
@@ -0,0 +1,371 @@
+# tree_queries.py
+"""
+Read helpers for the pages – the SQL the UI runs against tree_data lives
+here so pages don't have to care how (or where) a lookup is answered.
+
+Data backend (env TREE_DATA_BACKEND):
+    postgres  – live queries through db_handler (default)
+    snapshot  – read-only local copy exported by scripts/export_snapshot.py
+                (see snapshot.py); the app keeps working without Postgres
+
+Search backend (env TREE_SEARCH_BACKEND):
+    memory  – in-process name index (default, see name_index.py)
+    db      – pg_trgm similarity search in Postgres; needs the indexes from
+              `python db_handler.py --create-trigram-indexes`
+              (falls back to memory on the snapshot backend)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+from cache_utils import LRUCache
+from psycopg2 import errors as pg_errors
+
+from db_handler import QUERY_CACHE_TTL, cached_query, get_data_version, shared_query
+
+DATA_BACKEND: str = os.getenv("TREE_DATA_BACKEND", "postgres").lower()
+SEARCH_BACKEND: str = os.getenv("TREE_SEARCH_BACKEND", "memory").lower()
+SEARCH_LIMIT: int = 50
+SIMILARITY_THRESHOLD: float = 0.3    # pg_trgm's own default
+CATALOG_PAGE_SIZE: int = int(os.getenv("CATALOG_PAGE_SIZE", "24"))
+DETAIL_CACHE_SIZE: int = int(os.getenv("DETAIL_CACHE_SIZE", "2000"))
+PREFETCH_TOP: int = 10               # details prefetched per result list
+
+# Score columns shown on the detail view, in display order.
+SCORE_LABELS: Dict[str, str] = {
+    "climate_adaptation":       "Climate adaptation",
+    "water_efficiency":         "Water efficiency",
+    "biodiversity_support":     "Biodiversity support",
+    "community_acceptance":     "Community acceptance",
+    "aesthetic_cultural_fit":   "Aesthetic & cultural fit",
+    "shade_public_use":         "Shade / public use",
+    "cost_of_planting":         "Cost of planting",
+    "maintenance_needs":        "Maintenance needs",
+    "lifespan_durability":      "Lifespan & durability",
+    "total_score":              "TOTAL score",
+}
+
+# Only what the detail view renders – not SELECT *.
+DETAIL_COLUMNS: Tuple[str, ...] = (
+    "id", "tree_name", "scientific_name", "rating", *SCORE_LABELS,
+    "image_path", "information", "suitability", "challenges",
+)
+
+# Keyset cursor: (tree_name, id) of the last row on the previous page.
+Cursor = Tuple[str, int]
+
+# ---------------------------------------------------------------------
+# Backend dispatch
+# ---------------------------------------------------------------------
+def _offline() -> bool:
+    return DATA_BACKEND == "snapshot"
+
+
+def _read(
+    query: str,
+    params: Optional[tuple | list] = None,
+    *,
+    name: str,
+    cache: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Run a read on the configured backend. *query* uses %s placeholders and
+    SQL both Postgres and SQLite understand; rows come back as dicts either way.
+    """
+    if _offline():
+        import snapshot
+
+        return snapshot.query(query, params, name=name)
+    if cache:
+        return cached_query(query, params, name=name)
+    return shared_query(query, params, name=name)
+
+
+_listing_missing_at: Optional[int] = None   # data version when tree_listing was missing
+
+
+def _listing(
+    view_query: str,
+    table_query: str,
+    params: Optional[tuple | list] = None,
+    *,
+    name: str,
+) -> List[Dict[str, Any]]:
+    """
+    Listing read from the precomputed tree_listing view (an index scan).
+    Falls back to *table_query* on tree_data while the view doesn't exist;
+    looked for again whenever the data version moves.
+    """
+    global _listing_missing_at
+    version = data_version()
+    if _offline() or _listing_missing_at != version:
+        try:
+            return _read(view_query, params, name=name)
+        except pg_errors.UndefinedTable:
+            _listing_missing_at = version
+    return _read(table_query, params, name=name)
+
+
+def data_version() -> int:
+    """Version of the data the pages are looking at (Postgres or snapshot)."""
+    if _offline():
+        import snapshot
+
+        return snapshot.data_version()
+    return get_data_version()
+
+# ---------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------
+# Trigram candidates via the GIN indexes: the % operator uses the
+# session's pg_trgm.similarity_threshold, which is left at its default, so
+# the prefilter is exact for any threshold >= SIMILARITY_THRESHOLD; the
+# real threshold is applied with similarity() on the candidates. (No SET
+# LOCAL: the query stays a plain SELECT that can go to a read replica.)
+_SIMILAR_CANDIDATES = """
+tree_name %% %(term)s OR scientific_name %% %(term)s
+OR tree_name ILIKE %(pattern)s OR scientific_name ILIKE %(pattern)s
+"""
+
+_SIMILAR_TEMPLATE = """
+SELECT id, tree_name, scientific_name, score
+FROM (
+    SELECT DISTINCT ON (tree_name)
+           id, tree_name, scientific_name, score, is_substring
+    FROM (
+        SELECT id, tree_name, scientific_name,
+               GREATEST(similarity(tree_name, %(term)s),
+                        similarity(scientific_name, %(term)s)) AS score,
+               (tree_name ILIKE %(pattern)s OR scientific_name ILIKE %(pattern)s)
+                   AS is_substring
+        FROM tree_data
+        WHERE {candidates}
+    ) c
+    WHERE is_substring OR score >= %(threshold)s
+    ORDER BY tree_name, id
+) matches
+ORDER BY is_substring DESC, score DESC, tree_name
+LIMIT %(limit)s;
+"""
+_SIMILAR_INDEXED_SQL = _SIMILAR_TEMPLATE.format(candidates=_SIMILAR_CANDIDATES)
+_SIMILAR_SCAN_SQL = _SIMILAR_TEMPLATE.format(candidates="TRUE")    # threshold below the default
+
+
+def _like_pattern(term: str) -> str:
+    """'%term%' with LIKE wildcards in *term* escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_similar(
+    term: str,
+    *,
+    limit: int = SEARCH_LIMIT,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Postgres-side search: substring matches first, then trigram-similar
+    names (similarity ≥ *threshold*), best first, at most *limit* rows.
+    Served by the GIN trigram indexes instead of a sequential scan, unless
+    *threshold* is below SIMILARITY_THRESHOLD.
+    """
+    term = term.strip()
+    if not term:
+        return []
+    indexed = threshold >= SIMILARITY_THRESHOLD
+    return cached_query(
+        _SIMILAR_INDEXED_SQL if indexed else _SIMILAR_SCAN_SQL,
+        {
+            "term": term,
+            "pattern": _like_pattern(term),
+            "threshold": threshold,
+            "limit": limit,
+        },
+        name="search_similar",
+    )
+
+
+def search_trees(term: str, *, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """Ranked rows (id, tree_name, scientific_name) matching *term*."""
+    if SEARCH_BACKEND == "db" and not _offline():
+        return search_similar(term, limit=limit)
+    from name_index import search_names
+
+    return search_names(term, limit=limit)
+
+
+# Same rows as tree_listing: the lowest id per name.
+_PREVIEW_SQL = """
+SELECT DISTINCT ON (tree_name)
+       id, tree_name, scientific_name
+FROM tree_data
+ORDER BY tree_name, id
+LIMIT %s;
+"""
+
+_LISTING_PREVIEW_SQL = """
+SELECT id, tree_name, scientific_name
+FROM tree_listing
+ORDER BY tree_name, id
+LIMIT %s;
+"""
+
+_LISTING_NAMES_SQL = """
+SELECT id, tree_name, scientific_name
+FROM tree_listing
+ORDER BY tree_name, id;
+"""
+
+
+def preview_trees(limit: int = 25) -> List[Dict[str, Any]]:
+    """First *limit* trees alphabetically – shown before anything is typed."""
+    return _listing(_LISTING_PREVIEW_SQL, _PREVIEW_SQL, (limit,), name="preview")
+
+
+def all_names() -> List[Dict[str, Any]]:
+    """id / tree_name / scientific_name of every distinct tree (name index source)."""
+    from name_index import _NAMES_SQL
+
+    return _listing(_LISTING_NAMES_SQL, _NAMES_SQL, name="name_index")
+
+# ---------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------
+# Every row of tree_data, not tree_listing: trees sharing a common name
+# but not a scientific name are separate catalog cards.
+_CATALOG_FIRST_SQL = """
+SELECT id, tree_name, scientific_name, image_path
+FROM tree_data
+ORDER BY tree_name, id
+LIMIT %s;
+"""
+
+_CATALOG_AFTER_SQL = """
+SELECT id, tree_name, scientific_name, image_path
+FROM tree_data
+WHERE (tree_name, id) > (%s, %s)
+ORDER BY tree_name, id
+LIMIT %s;
+"""
+
+
+def catalog_page(
+    after: Optional[Cursor] = None,
+    *,
+    limit: int = CATALOG_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+    """
+    One alphabetical page of the catalog (keyset pagination on
+    tree_name, id). Returns (rows, cursor for the next page or None).
+    """
+    if after is None:
+        rows = _read(_CATALOG_FIRST_SQL, (limit + 1,), name="catalog_page")
+    else:
+        rows = _read(
+            _CATALOG_AFTER_SQL, (after[0], after[1], limit + 1), name="catalog_page"
+        )
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (last["tree_name"], last["id"])
+
+
+def catalog_count() -> int:
+    """Number of trees in the catalog."""
+    return _read("SELECT count(*) AS n FROM tree_data;", name="catalog_count")[0]["n"]
+
+
+_SCORES_SQL = (
+    f"SELECT id, tree_name, scientific_name, image_path, {', '.join(SCORE_LABELS)} "
+    "FROM tree_data ORDER BY tree_name, id;"
+)
+
+
+def score_rows() -> List[Dict[str, Any]]:
+    """Every tree with its score columns – the recommender's input."""
+    return _read(_SCORES_SQL, name="score_rows")
+
+
+# ---------------------------------------------------------------------
+# Tree details (batched, cached per id, prefetchable)
+# ---------------------------------------------------------------------
+_DETAILS_SQL = (
+    f"SELECT {', '.join(DETAIL_COLUMNS)} FROM tree_data WHERE id = ANY(%s);"
+)
+# SQLite has no arrays – the id list travels as one JSON parameter.
+_DETAILS_SNAPSHOT_SQL = (
+    f"SELECT {', '.join(DETAIL_COLUMNS)} FROM tree_data "
+    "WHERE id IN (SELECT value FROM json_each(%s));"
+)
+
+_details = LRUCache(max_entries=DETAIL_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+_details_version: Optional[int] = None
+_details_lock = threading.Lock()
+_prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="detail-prefetch")
+
+
+def _check_version() -> None:
+    """Forget cached details when the data version moved."""
+    global _details_version
+    version = data_version()
+    with _details_lock:
+        if version != _details_version:
+            _details.clear()
+            _details_version = version
+
+
+def get_tree_details(ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Detail rows for *ids* as {id: row}. Cached ids are served from memory;
+    the rest are fetched in ONE `WHERE id = ANY(...)` query. Unknown ids
+    are simply absent from the result.
+    """
+    _check_version()
+    found: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    for tree_id in dict.fromkeys(ids):
+        row = _details.get(tree_id)
+        if row is None:
+            missing.append(tree_id)
+        else:
+            found[tree_id] = row
+    if missing:
+        if _offline():
+            rows = _read(_DETAILS_SNAPSHOT_SQL, (json.dumps(missing),), name="tree_details")
+        else:
+            rows = _read(_DETAILS_SQL, (missing,), name="tree_details", cache=False)
+        for row in rows:
+            _details.set(row["id"], row)
+            found[row["id"]] = row
+    return found
+
+
+def get_tree_detail(tree_id: int) -> Optional[Dict[str, Any]]:
+    """One tree's detail row, or None if it no longer exists."""
+    return get_tree_details([tree_id]).get(tree_id)
+
+
+def prefetch_details(ids: Iterable[int], *, limit: int = PREFETCH_TOP) -> None:
+    """Warm the detail cache for the first *limit* ids in the background."""
+    ids = [i for i in list(ids)[:limit] if i not in _details]
+    if ids:
+        _prefetcher.submit(get_tree_details, ids)
+
+
+metrics.register_collector(
+    lambda: {f"detail_cache_{k}": v for k, v in _details.stats().items()}
+)
+
+
+def invalidate_details(ids: Optional[Iterable[int]] = None) -> None:
+    """Drop cached details for *ids* (all of them if None)."""
+    if ids is None:
+        _details.clear()
+    else:
+        for tree_id in ids:
+            _details.pop(tree_id)
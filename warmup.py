@@ -0,0 +1,203 @@
+# warmup.py
+"""
+Background cache warm-up, once per server process.
+
+Started by app.py (and header.show(), for sessions that land on a page
+directly), so the first visitor after a deploy doesn't pay for the first
+DB connection, the catalog queries, building the search index or reading
+every tree image. Steps run in order in one daemon thread:
+
+• database     – open the pool, read the data version
+• listing      – first catalog page, catalog count, search preview and the
+                 preview trees' details
+• search_index – in-memory name index (name_index.get_index)
+• recommender  – score matrix (recommend.get_matrix)
+• images       – after the Git-LFS pull: logos into the image cache, every
+                 tree's catalog and detail thumbnails built on disk, the
+                 detail ones (thumbnails.DETAIL_WIDTH, as st.image() sends
+                 them) into the image cache up to half its budget; first
+                 catalog page first
+
+A failing step is recorded and the rest still run. status() reports
+readiness and per-step timings (shown on the Metrics page); timings also
+go to the warmup_seconds histogram.
+
+Env:
+    CACHE_WARMUP – set to 0 to disable
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+
+ENABLED: bool = os.getenv("CACHE_WARMUP", "1") != "0"
+
+REPO_ROOT = Path(__file__).resolve().parent
+LOGOS = (REPO_ROOT / "assets" / "hasar_logo.png", REPO_ROOT / "assets" / "gov_logo.png")
+
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_ready = threading.Event()
+_status: Dict[str, Any] = {"state": "pending", "steps": {}}
+
+# ---------------------------------------------------------------------
+# Steps
+# ---------------------------------------------------------------------
+def _database() -> str:
+    from tree_queries import data_version
+
+    return f"data version {data_version()}"
+
+
+def _listing() -> str:
+    from tree_queries import catalog_count, catalog_page, get_tree_details, preview_trees
+
+    catalog_page()
+    preview = preview_trees()
+    get_tree_details(r["id"] for r in preview)
+    return f"{catalog_count()} trees"
+
+
+def _search_index() -> str:
+    from tree_queries import SEARCH_BACKEND, _offline
+
+    if SEARCH_BACKEND == "db" and not _offline():
+        return "skipped (TREE_SEARCH_BACKEND=db)"
+    from name_index import get_index
+
+    get_index()
+    return "built"
+
+
+def _recommender() -> str:
+    from recommend import get_matrix
+
+    get_matrix()
+    return "built"
+
+
+def _image_sources() -> List[Path]:
+    """Tree images, the first catalog page's in grid order first."""
+    from thumbnails import IMAGE_SUFFIXES, IMG_DIR
+    from tree_queries import catalog_page
+
+    first = [
+        REPO_ROOT / r["image_path"] for r in catalog_page()[0] if r.get("image_path")
+    ]
+    rest = sorted(p for p in IMG_DIR.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    seen = set()
+    return [p for p in first + rest if not (p in seen or seen.add(p))]
+
+
+def _images() -> str:
+    import lfs_bootstrap
+    from catalog_grid import SRCSET_WIDTHS
+    from header import LOGO_WIDTH
+    from image_cache import IMAGE_CACHE_MAX_BYTES, image_cache_stats, load_image
+    from thumbnails import DETAIL_WIDTH, display_thumbnail_path, thumbnail_path
+
+    lfs_bootstrap.ensure_lfs_pulled()
+    lfs_bootstrap.wait("logos")
+    for logo in LOGOS:
+        try:
+            load_image(logo, width=LOGO_WIDTH)
+        except Exception:                 # pointer / missing: header shows a placeholder
+            pass
+
+    lfs_bootstrap.wait("tree_images")
+    budget = IMAGE_CACHE_MAX_BYTES // 2
+    built = cached = failed = 0
+    for src in _image_sources():
+        thumbs = [thumbnail_path(src, w) for w in SRCSET_WIDTHS]
+        detail = display_thumbnail_path(src, DETAIL_WIDTH)
+        if None in thumbs or detail is None:
+            failed += 1
+            continue
+        built += 1
+        if image_cache_stats()["bytes"] < budget:
+            load_image(detail, width=DETAIL_WIDTH)      # same key show_tree_image uses
+            cached += 1
+    return f"{built} images ready, {cached} cached in memory, {failed} unusable"
+
+
+STEPS: List[tuple[str, Callable[[], str]]] = [
+    ("database", _database),
+    ("listing", _listing),
+    ("search_index", _search_index),
+    ("recommender", _recommender),
+    ("images", _images),
+]
+
+# ---------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------
+def _set_step(name: str, **fields) -> None:
+    with _lock:
+        _status["steps"].setdefault(name, {}).update(fields)
+
+
+def _run() -> None:
+    with _lock:
+        _status.update(state="running", started_at=time.time())
+    t_start = time.perf_counter()
+    failed = []
+    for name, step in STEPS:
+        _set_step(name, state="running")
+        t0 = time.perf_counter()
+        try:
+            detail = step()
+            state, extra = "done", {"detail": detail}
+        except Exception as e:
+            failed.append(name)
+            state, extra = "failed", {"error": f"{type(e).__name__}: {e}"}
+            print(f"⚠️  Warm-up step {name} failed:", e, file=sys.stderr)
+        seconds = time.perf_counter() - t0
+        _set_step(name, state=state, seconds=round(seconds, 3), **extra)
+        if metrics.ENABLED:
+            metrics.observe("warmup_seconds", seconds, step=name)
+
+    total = time.perf_counter() - t_start
+    with _lock:
+        _status.update(state="failed" if failed else "ready", seconds=round(total, 3))
+    _ready.set()
+    timings = ", ".join(f"{n} {s.get('seconds', 0):.2f}s" for n, s in status()["steps"].items())
+    note = f" ({', '.join(failed)} failed)" if failed else ""
+    print(f"🔥  Warm-up finished in {total:.2f}s{note}: {timings}")
+
+
+def start() -> None:
+    """Start the warm-up thread (once per process; no-op if CACHE_WARMUP=0)."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        if not ENABLED:
+            _thread = threading.current_thread()
+            _status["state"] = "disabled"
+            _ready.set()
+            return
+        _thread = threading.Thread(target=_run, name="cache-warmup", daemon=True)
+        _thread.start()
+
+
+def wait(timeout: Optional[float] = None) -> bool:
+    """Block until the warm-up has finished; False on timeout."""
+    return _ready.wait(timeout)
+
+
+def ready() -> bool:
+    return _ready.is_set()
+
+
+def status() -> Dict[str, Any]:
+    """Overall state (pending/running/ready/failed/disabled), total and per-step timings."""
+    with _lock:
+        return {**_status, "steps": {n: dict(s) for n, s in _status["steps"].items()}}
+
+
+metrics.register_collector(lambda: {"warmup_ready": float(_status["state"] == "ready")})